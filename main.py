@@ -3,52 +3,26 @@ Step 1: Make sure that you have a MySQL database running. Update the .env file a
 Step 2: Activate virtual environment. 
 Step 3: Run get_links task: `python main.py get_links -s Zooplus`
 Step 3: Run scrape task: `python main.py scrape -s Zooplus`
+Or do both in one streaming pass: `python main.py pipeline -s Zooplus`
+Add `--cache` to keep the raw responses, then re-parse them offline with `python main.py scrape -s Zooplus --replay`
+Omit `-s` to run every shop in parallel, e.g. `python main.py scrape -w 8`
 """
 
 
 import os
 import sys
+import asyncio
 import argparse
 import datetime as dt
 from loguru import logger
 from dotenv import load_dotenv
 from pet_products_scraper import utils
-from pet_products_scraper import (
-    PetProductsETL,
-    ZooplusETL,
-    PetsAtHomeETL,
-    JollyesETL,
-    LilysKitchenETL,
-    BitibaETL,
-    PetSupermarketETL,
-    PetPlanetETL,
-    PurinaETL,
-    DirectVetETL,
-    FishKeeperETL,
-    PetDrugsOnlineETL,
-    ViovetETL,
-    PetShopETL,
-    VetShopETL,
-    VetUKETL,
-    BurnsPetETL,
-    AsdaETL,
-    TheRangeETL,
-    OcadoETL,
-    HarringtonsETL,
-    BernPetFoodsETL,
-    PetsCornerETL,
-    OrijenETL,
-    ThePetExpressETL,
-    PetShopOnlineETL,
-    TaylorPetFoodsETL,
-    TheNaturalPetStoreETL,
-    HealthyPetStoreETL,
-    FarmAndPetPlaceETL,
-    NaturesMenuETL,
-
-    PetImage
-)
-
+from pet_products_scraper.browser import configure_browser_pool, close_browser_pool
+from pet_products_scraper.cache import CACHE_DIR, RECORD, REPLAY, configure_response_cache
+from pet_products_scraper.humanize import STEALTH_PROFILES, configure_stealth
+from pet_products_scraper.loader import FLUSH_SIZE
+from pet_products_scraper.orchestrator import MAX_SOCKETS, MAX_WORKERS, run_shops, run_task
+from pet_products_scraper.throttle import get_rate_limiter
 
 SHOPS = [
     # "Zooplus",
@@ -86,56 +60,35 @@ SHOPS = [
 PROGRAM_NAME = "Pet Products Scraper"
 
 
-def run_etl(shop: str) -> PetProductsETL:
-    factory = {
-        "Zooplus": ZooplusETL(),  # Done WIP on how to bypass completly CloudFront
-        "PetsAtHome": PetsAtHomeETL(),  # Done
-        "Jollyes": JollyesETL(),  # Done
-        "LilysKitchen": LilysKitchenETL(),  # Done
-        "Bitiba": BitibaETL(),  # Done But WIP on how to bypass completly CloudFront
-        "PetSupermarket": PetSupermarketETL(),  # Done
-        "PetPlanet": PetPlanetETL(),  # Done
-        "Purina": PurinaETL(),  # Done
-        "DirectVet": DirectVetETL(),  # Done
-        "FishKeeper": FishKeeperETL(),  # Done
-        "PetDrugsOnline": PetDrugsOnlineETL(),  # Done
-        "Viovet": ViovetETL(),  # Done
-        "PetShop": PetShopETL(),  # Done
-        "VetShop": VetShopETL(),  # Done
-        "VetUK": VetUKETL(),  # Done
-        "BurnsPet": BurnsPetETL(),  # Done
-        "ASDAGroceries": AsdaETL(),  # Done
-        "TheRange": TheRangeETL(),  # Done Scraping but Cloudfalre Problem
-        "Ocado": OcadoETL(),  # Done
-        "Harringtons": HarringtonsETL(),  # Done
-        "BernPetFoods": BernPetFoodsETL(),  # Done
-        "PetsCorner": PetsCornerETL(),  # Done
-        "Orijen": OrijenETL(),  # Done
-        "ThePetExpress": ThePetExpressETL(),  # Done
-        "PetShopOnline": PetShopOnlineETL(),  # Done
-        "TaylorPetFoods": TaylorPetFoodsETL(),  # Done
-        "TheNaturalPetStore": TheNaturalPetStoreETL(),  # Done
-        "HealthyPetStore": HealthyPetStoreETL(),  # Done
-        "FarmAndPetPlace": FarmAndPetPlaceETL(),  # Done
-        "NaturesMenu": NaturesMenuETL(),  # Done
-    }
-
-    if shop in factory:
-        return factory[shop]
-    else:
-        raise ValueError(
-            f"Shop {shop} is not supported. Please pass a valid shop.")
-
-
 parser = argparse.ArgumentParser(
     prog=PROGRAM_NAME,
     description="Scrape product details from various pet shops."
 )
 
 parser.add_argument("task", choices=[
-                    "get_links", "scrape", "get_image"], help="Identify the task to be executed. get_links=get links from registered shops; scrape=scrape products.")
+                    "get_links", "scrape", "pipeline", "get_image"], help="Identify the task to be executed. get_links=get links from registered shops; scrape=scrape products; pipeline=get links and scrape their products as they are found.")
 parser.add_argument("-s", "--shop", choices=SHOPS,
                     help="Select a shop to scrape. Default: all shops.")
+parser.add_argument("-c", "--concurrency", type=int,
+                    help="Maximum number of product pages fetched at once. Default: the shop's own limit.")
+parser.add_argument("--flush-size", type=int, default=FLUSH_SIZE,
+                    help=f"Number of product rows buffered before they are written to the database. Default: {FLUSH_SIZE}.")
+parser.add_argument("--browsers", type=int, default=2,
+                    help="Number of warm headless browsers shared by the run. Default: 2.")
+parser.add_argument("--pages-per-context", type=int, default=50,
+                    help="Recycle a browser context after this many pages. Default: 50.")
+parser.add_argument("-w", "--workers", type=int, default=MAX_WORKERS,
+                    help=f"Number of shops run in parallel when no shop is selected. Default: {MAX_WORKERS}.")
+parser.add_argument("--max-sockets", type=int, default=MAX_SOCKETS,
+                    help=f"Total number of connections shared by the shops run in parallel. Default: {MAX_SOCKETS}.")
+parser.add_argument("--cache", action="store_true",
+                    help="Store the raw responses in the response cache while fetching.")
+parser.add_argument("--replay", action="store_true",
+                    help="Parse the products from the response cache only, without any network request.")
+parser.add_argument("--cache-dir", default=CACHE_DIR,
+                    help=f"Directory of the response cache. Default: {CACHE_DIR}.")
+parser.add_argument("--stealth", choices=STEALTH_PROFILES,
+                    help="Humanization of browser pages for every shop, overriding the profile of each shop and STEALTH_PROFILE in .env.")
 args = parser.parse_args()
 
 if __name__ == "__main__":
@@ -143,10 +96,11 @@ if __name__ == "__main__":
     start_time = dt.datetime.now()
 
     logger.remove()
-    logger.add("logs/std_out.log", rotation="10 MB", level="INFO")
-    logger.add("logs/std_err.log", rotation="10 MB", level="ERROR")
-    logger.add(sys.stdout, level="INFO")
-    logger.add(sys.stderr, level="ERROR")
+    # Enqueued so that the worker processes of a multi-shop run share the sinks safely
+    logger.add("logs/std_out.log", rotation="10 MB", level="INFO", enqueue=True)
+    logger.add("logs/std_err.log", rotation="10 MB", level="ERROR", enqueue=True)
+    logger.add(sys.stdout, level="INFO", enqueue=True)
+    logger.add(sys.stderr, level="ERROR", enqueue=True)
 
     logger.info(f"{PROGRAM_NAME} has started")
 
@@ -157,7 +111,7 @@ if __name__ == "__main__":
     MYSQL_DATABASE = os.getenv("MYSQL_DATABASE")
     MYSQL_DRIVER = os.getenv("MYSQL_DRIVER")
 
-    engine = utils.get_db_conn(
+    db_settings = dict(
         drivername=MYSQL_DRIVER,
         username=MYSQL_USER,
         password=None,
@@ -165,37 +119,45 @@ if __name__ == "__main__":
         port=MYSQL_PORT,
         database=MYSQL_DATABASE,
     )
+    engine = utils.get_db_conn(**db_settings)
 
     task = args.task
     shop = args.shop
 
-    if task == "get_links":
-        client = run_etl(shop)
-        utils.execute_query(engine, "TRUNCATE TABLE stg_urls;")
-        client.refresh_links(engine, "stg_urls")
+    configure_browser_pool(args.browsers, args.pages_per_context)
+    configure_stealth(args.stealth or os.getenv("STEALTH_PROFILE"))
 
-        sql = utils.get_sql_from_file("insert_into_urls.sql")
-        utils.execute_query(engine, sql)
+    if args.replay:
+        configure_response_cache(REPLAY, args.cache_dir)
+        get_rate_limiter().enabled = False
 
-    elif task == "scrape":
-        client = run_etl(shop)
-        utils.execute_query(engine, "TRUNCATE TABLE stg_pet_products;")
-        client.run(engine, "stg_pet_products")
+    elif args.cache:
+        configure_response_cache(RECORD, args.cache_dir)
 
-        sql = utils.get_sql_from_file("insert_into_pet_products.sql")
-        utils.execute_query(engine, sql)
+    if task in ("get_links", "scrape", "pipeline") and shop is None:
+        run_shops(
+            db_settings,
+            task,
+            SHOPS,
+            workers=args.workers,
+            browsers=args.browsers,
+            pages_per_context=args.pages_per_context,
+            max_sockets=args.max_sockets,
+            concurrency=args.concurrency,
+            flush_size=args.flush_size,
+        )
 
-        sql = utils.get_sql_from_file("insert_into_pet_product_variants.sql")
-        utils.execute_query(engine, sql)
-
-        sql = utils.get_sql_from_file(
-            "insert_into_pet_product_variant_prices.sql")
-        utils.execute_query(engine, sql)
+    elif task in ("get_links", "scrape", "pipeline"):
+        run_task(engine, task, shop, args.concurrency, args.flush_size)
 
     elif task == "get_image":
+        from pet_products_scraper.image import PetImage
+
         pi = PetImage('./csv/pet_product_variant_urls.csv')
         pi.extract(0.5, 1)  # Args (min_sec, max_sec)
 
+    asyncio.run(close_browser_pool())
+
     end_time = dt.datetime.now()
     duration = end_time - start_time
     logger.info(f"{PROGRAM_NAME} (shop={shop}) has ended. Elapsed: {duration}")
@@ -1,32 +1,22 @@
-from ._pet_products_etl import PetProductsETL
-from ._zooplus_etl import ZooplusETL
-from ._petsathome_etl import PetsAtHomeETL
-from ._jollyes_etl import JollyesETL
-from ._lilyskitchen_etl import LilysKitchenETL
-from ._bitiba_etl import BitibaETL
-from ._petsupermarket_etl import PetSupermarketETL
-from ._petplanet_etl import PetPlanetETL
-from ._purina_etl import PurinaETL
-from ._directvet_etl import DirectVetETL
-from ._fishkeeper_etl import FishKeeperETL
-from ._petdrugsonline_etl import PetDrugsOnlineETL
-from ._viovet_etl import ViovetETL
-from ._petshop import PetShopETL
-from ._vetshop import VetShopETL
-from ._vetuk import VetUKETL
-from ._burnspet import BurnsPetETL
-from ._asda import AsdaETL
-from ._therange import TheRangeETL
-from ._ocado import OcadoETL
-from ._harringtons import HarringtonsETL
-from ._bernpetfoods import BernPetFoodsETL
-from ._petscorner import PetsCornerETL
-from ._orijen import OrijenETL
-from ._thepetexpress import ThePetExpressETL
-from ._petshoponline import PetShopOnlineETL
-from ._taylorpetfoods import TaylorPetFoodsETL
-from ._thenaturalpetstore import TheNaturalPetStoreETL
-from ._healthypetstore import HealthyPetStoreETL
-from ._farmandpetplace import FarmAndPetPlaceETL
-from ._naturesmenu import NaturesMenuETL
-from .image import PetImage
+import importlib
+
+from .registry import SHOP_REGISTRY, get_shop_class, get_shop_etl
+
+_LAZY_ATTRIBUTES = {
+    "PetProductsETL": ("._pet_products_etl", "PetProductsETL"),
+    "PetImage": (".image", "PetImage"),
+    **{class_name: (module_name, class_name) for module_name, class_name in SHOP_REGISTRY.values()},
+}
+
+__all__ = ["SHOP_REGISTRY", "get_shop_class", "get_shop_etl", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str):
+    # Resolve the ETL classes on first access instead of importing every shop module
+    if name in _LAZY_ATTRIBUTES:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+        value = getattr(importlib.import_module(module_name, __name__), attribute)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
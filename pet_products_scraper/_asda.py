@@ -1,6 +1,5 @@
 import re
 import requests
-import random
 import pandas as pd
 
 from datetime import datetime as dt
@@ -9,6 +8,7 @@ from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .fetchers import BROWSER, HTTP
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 from tenacity import (
     before_sleep_log,
@@ -18,11 +18,6 @@ from tenacity import (
     wait_random,
 )
 
-import asyncio
-import nest_asyncio
-from playwright.async_api import async_playwright
-nest_asyncio.apply()
-
 MAX_RETRIES = 10
 MAX_WAIT_BETWEEN_REQ = 1
 MIN_WAIT_BETWEEN_REQ = 0.5
@@ -35,6 +30,9 @@ class AsdaETL(PetProductsETL):
         super().__init__()
         self.SHOP = "ASDAGroceries"
         self.BASE_URL = "https://groceries.asda.com"
+        self.FETCH_TIERS = [HTTP, BROWSER]
+        self.PRODUCT_SELECTOR = 'h1.pdp-main-details__title'
+        self.pace(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
         self.CATEGORIES = [
             "/shelf/pet-food-accessories/dog-food-accessories/dog-treats-chews-biscuits/dental-treats-health-treats/1215662103573-1215680107518-1215680108312-1215684181111",
             '/shelf/pet-food-accessories/dog-food-accessories/dog-treats-chews-biscuits/natural-treats/1215662103573-1215680107518-1215680108312-1215684181112',
@@ -117,23 +115,15 @@ class AsdaETL(PetProductsETL):
         reraise=True,
     )
     async def extract_scrape_content(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    user_agent=UserAgent().random,
-                    locale="en-US"
-                )
-
-                page = await context.new_page()
-
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
+
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                locale="en-US"
+            ) as page:
                 await page.set_extra_http_headers({
                     "User-Agent": UserAgent().random,
                     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -142,34 +132,24 @@ class AsdaETL(PetProductsETL):
                     "Request-Origin": "gi"
                 })
 
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
                 await page.wait_for_selector(selector, timeout=30000)
 
-                for _ in range(random.randint(3, 6)):
-                    await page.mouse.wheel(0, random.randint(300, 700))
-                    await asyncio.sleep(random.uniform(0.5, 1))
-
-                for _ in range(random.randint(5, 10)):
-                    await page.mouse.move(random.randint(0, 800), random.randint(0, 600))
-                    await asyncio.sleep(random.uniform(0.5, 1))
+                await self.humanize(page)
 
                 rendered_html = await page.content()
+                self.write_cache("GET", url, rendered_html.encode())
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 soup = BeautifulSoup(rendered_html, "html.parser")
                 return soup
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
-
     def transform(self, soup: BeautifulSoup, url: str):
         try:
             product_name = soup.find(
@@ -248,7 +228,7 @@ class AsdaETL(PetProductsETL):
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
 
-    def get_links(self, category: str) -> pd.DataFrame:
+    async def get_links_async(self, category: str) -> pd.DataFrame:
         if category not in self.CATEGORIES:
             raise ValueError(
                 f"Invalid category. Value must be in {self.CATEGORIES}")
@@ -256,16 +236,15 @@ class AsdaETL(PetProductsETL):
         category_link = f"{self.BASE_URL}{category}"
         urls = []
 
-        soup = asyncio.run(self.extract_scrape_content(
-            category_link, '#main-content'))
+        soup = await self.extract_scrape_content(
+            category_link, '#main-content')
 
         if soup.find('div', class_="co-pagination"):
             n_pages = int(
                 soup.find('div', class_="co-pagination__max-page").text)
 
             for p in range(1, n_pages):
-                soup_page_pagination = asyncio.run(
-                    self.extract_scrape_content(f"{category_link}?page={p}", '#main-content'))
+                soup_page_pagination = await self.extract_scrape_content(f"{category_link}?page={p}", '#main-content')
                 for product_container in soup_page_pagination.find_all('ul', class_="co-product-list__main-cntr"):
                     for product_list in product_container.find_all('li'):
                         if product_list.find('a'):
@@ -283,41 +262,8 @@ class AsdaETL(PetProductsETL):
         df.insert(0, "shop", self.SHOP)
         return df
 
-    def refresh_links(self, db_conn: Engine, table_name: str):
-        execute_query(db_conn, f"TRUNCATE TABLE {table_name};")
-
-        for category in self.CATEGORIES:
-            df = self.get_links(category)
-            if df is not None:
-                self.load(df, db_conn, table_name)
-
-        sql = get_sql_from_file("insert_into_urls.sql")
-        execute_query(db_conn, sql)
-
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
-
-        for i, row in df_urls.iterrows():
-
-            pkey = row["id"]
-            url = row["url"]
-
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = asyncio.run(
-                self.extract_scrape_content(url, '#main-content'))
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
-
-    def image_scrape_product(self, url):
-        soup = asyncio.run(self.extract_scrape_content(url, '#main-content'))
+    async def image_scrape_product_async(self, url):
+        soup = await self.extract_scrape_content(url, '#main-content')
 
         return {
             'shop': self.SHOP,
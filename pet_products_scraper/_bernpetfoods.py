@@ -1,4 +1,3 @@
-import requests
 import re
 import json
 import pandas as pd
@@ -7,8 +6,12 @@ from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .feefo import get_feefo_client
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 
+FEEFO_MERCHANT = "bern-pet-foods"
+FEEFO_ORIGIN = "www.bernpetfoods.co.uk"
+
 
 class BernPetFoodsETL(PetProductsETL):
 
@@ -16,12 +19,17 @@ class BernPetFoodsETL(PetProductsETL):
         super().__init__()
         self.SHOP = "BernPetFoods"
         self.BASE_URL = "https://www.bernpetfoods.co.uk"
+        self.FEEFO_MERCHANT = FEEFO_MERCHANT
+        self.FEEFO_ORIGIN = FEEFO_ORIGIN
         self.CATEGORIES = [
             "/product-category/dog-food/",
             "/product-category/cat-food/",
             "/product-category/cat-litter/",
         ]
 
+    def get_rating_sku(self, soup: BeautifulSoup) -> str:
+        return re.search(r'postid-(\d+)', ' '.join(soup.body['class'])).group(0)
+
     def transform(self, soup: BeautifulSoup, url: str):
         try:
             product_name = soup.find(
@@ -30,13 +38,11 @@ class BernPetFoodsETL(PetProductsETL):
                 'div', class_="description_fullcontent").get_text(separator=' ', strip=True)
             product_url = url.replace(self.BASE_URL, "")
 
-            product_id = re.search(
-                r'postid-(\d+)', ' '.join(soup.body['class'])).group(0)
-
-            rating_wrapper = requests.get(
-                f"https://api.feefo.com/api/10/reviews/summary/product?since_period=ALL&parent_product_sku={product_id}&merchant_identifier=bern-pet-foods&origin=www.bernpetfoods.co.uk")
-            rating = int(rating_wrapper.json()['rating']['rating'])
-            product_rating = f'{rating}/5'
+            product_rating = '0/5'
+            rating = get_feefo_client().summary_rating(
+                FEEFO_MERCHANT, FEEFO_ORIGIN, self.get_rating_sku(soup))
+            if rating is not None:
+                product_rating = f'{int(rating)}/5'
 
             variants = []
             prices = []
@@ -1,16 +1,18 @@
 import re
 import json
-import time
 import pandas as pd
 from datetime import datetime as dt
 from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .throttle import get_host, get_rate_limiter
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 
 from fake_useragent import UserAgent
 
+PRODUCT_PAGE_SECONDS = 302
+
 headers = {
     "Accept": 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
     'Accept-Encoding': 'gzip, deflate, br, zstd',
@@ -37,6 +39,8 @@ class BitibaETL(PetProductsETL):
         super().__init__()
         self.SHOP = "Bitiba"
         self.BASE_URL = "https://www.bitiba.co.uk"
+        self.CONCURRENCY = 1
+        self.HANDOFF_URL = self.BASE_URL
         self.CATEGORIES = ["/shop/dogs", "/shop/dogs_accessories", "/shop/cats",
                            "/shop/cats_accessories", "/shop/veterinary", "/shop/small_pets"]
 
@@ -199,28 +203,11 @@ class BitibaETL(PetProductsETL):
 
             return df
 
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
-
-        for i, row in df_urls.iterrows():
-
-            pkey = row["id"]
-            url = row["url"]
-
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = self.extract_from_url("GET", url, headers=headers)
-            time.sleep(302)
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
-
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
+    async def fetch_product(self, url: str) -> BeautifulSoup:
+        # Product pages get a much smaller budget than the category listing
+        await get_rate_limiter().wait_async(
+            f"{get_host(url)}/product", 1 / PRODUCT_PAGE_SECONDS, 1)
+        return await self.fetch_page(url, headers=headers)
 
     def image_scrape_product(self, url):
         soup = self.extract_from_url("GET", url, headers=headers)
@@ -1,4 +1,3 @@
-import requests
 import pandas as pd
 from datetime import datetime
 from loguru import logger
@@ -77,7 +76,8 @@ class BurnsPetETL(PetProductsETL):
 
                 sku_encoded = "%2C".join(sku.split(",")) if sku else ""
 
-                get_rating_details = requests.get(
+                get_rating_details = self.request(
+                    "GET",
                     f"https://widget.trustpilot.com/trustbox-data/{template_id}?businessUnitId={business_unit_id}&locale={locale}&sku={sku_encoded}")
                 if get_rating_details.status_code == 200:
                     if get_rating_details.json()["productReviewsSummary"]["starsAverage"] == 0.0:
@@ -70,7 +70,7 @@ class DirectVetETL(PetProductsETL):
         super().__init__()
         self.SHOP = "DirectVet"
         self.BASE_URL = "https://www.direct-vet.co.uk"
-        self.CATEGORIES = self.get_category_links()
+        self.CATEGORIES = []
 
     def get_category_links(self):
         soup = self.extract_from_url('GET', self.BASE_URL)
@@ -211,11 +211,12 @@ class DirectVetETL(PetProductsETL):
         df.insert(0, "shop", self.SHOP)
         return df
 
-    # def run(self, db_conn: Engine, table_name: str):
-    #     pass
+    def get_categories(self) -> list:
+        # The category list is read from the live homepage, so only fetch it when needed
+        if not self.CATEGORIES:
+            self.CATEGORIES = self.get_category_links()
 
-    # def refresh_links(self, db_conn: Engine, table_name: str):
-    #     pass
+        return self.CATEGORIES
 
     def image_scrape_product(self, url):
         soup = self.extract_from_url("GET", url)
@@ -1,5 +1,4 @@
 import re
-import requests
 import math
 import pandas as pd
 from datetime import datetime
@@ -7,8 +6,12 @@ from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .feefo import get_feefo_client
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 
+FEEFO_MERCHANT = "farm-pet-place"
+FEEFO_ORIGIN = "www.farmandpetplace.co.uk"
+
 
 class FarmAndPetPlaceETL(PetProductsETL):
 
@@ -16,6 +19,8 @@ class FarmAndPetPlaceETL(PetProductsETL):
         super().__init__()
         self.SHOP = "FarmAndPetPlace"
         self.BASE_URL = "https://www.farmandpetplace.co.uk"
+        self.FEEFO_MERCHANT = FEEFO_MERCHANT
+        self.FEEFO_ORIGIN = FEEFO_ORIGIN
         self.CATEGORIES = [
             '/shop/products/pet/dog/dog-food/dry-dog-food/dr-green-dog-food/page-1.html',
             '/shop/products/pet/dog/dog-food/dry-dog-food/diamond-naturals/page-1.html',
@@ -387,6 +392,9 @@ class FarmAndPetPlaceETL(PetProductsETL):
             '/shop/products/wild-bird/other-wildlife/squirrels/page-1.html'
         ]
 
+    def get_rating_sku(self, soup: BeautifulSoup) -> str:
+        return soup.find('div', class_="ruk_rating_snippet").get('data-sku')
+
     def transform(self, soup: BeautifulSoup, url: str):
         try:
             product_name = soup.find(
@@ -398,13 +406,11 @@ class FarmAndPetPlaceETL(PetProductsETL):
                     'div', class_="short-description").get_text(strip=True)
 
             product_url = url.replace(self.BASE_URL, "")
-            product_id = soup.find(
-                'div', class_="ruk_rating_snippet").get('data-sku')
-
-            rating_wrapper = requests.get(
-                f"https://api.feefo.com/api/10/reviews/summary/product?since_period=ALL&parent_product_sku={product_id}&merchant_identifier=farm-pet-place&origin=www.farmandpetplace.co.uk")
-            rating = float(rating_wrapper.json()['rating']['rating'])
-            product_rating = f'{rating}/5'
+            product_rating = '0/5'
+            rating = get_feefo_client().summary_rating(
+                FEEFO_MERCHANT, FEEFO_ORIGIN, self.get_rating_sku(soup))
+            if rating is not None:
+                product_rating = f'{float(rating)}/5'
 
             variants = []
             prices = []
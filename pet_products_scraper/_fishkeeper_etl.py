@@ -11,6 +11,7 @@ from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .feefo import get_feefo_client
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 
 from tenacity import (
@@ -23,14 +24,16 @@ from tenacity import (
 
 from fake_useragent import UserAgent
 import asyncio
-import nest_asyncio
-from playwright.async_api import async_playwright
-nest_asyncio.apply()
+from .browser import capture_responses
 
 MAX_RETRIES = 10
 MAX_WAIT_BETWEEN_REQ = 1
 MIN_WAIT_BETWEEN_REQ = 0
 REQUEST_TIMEOUT = 30
+FEEFO_MERCHANT = "maidenhead-aquatics"
+# The category listings are Algolia InstantSearch results
+ALGOLIA_QUERIES = ".algolia.net/1/indexes/"
+ALGOLIA_TIMEOUT = 10
 
 
 class FishKeeperETL(PetProductsETL):
@@ -39,6 +42,8 @@ class FishKeeperETL(PetProductsETL):
         super().__init__()
         self.SHOP = "FishKeeper"
         self.BASE_URL = "https://www.fishkeeper.co.uk"
+        self.FEEFO_MERCHANT = FEEFO_MERCHANT
+        self.pace(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
         self.CATEGORIES = [
             "/aquarium-products",
             "/pond-products",
@@ -54,23 +59,15 @@ class FishKeeperETL(PetProductsETL):
         reraise=True,
     )
     async def extract_scrape_content(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    user_agent=UserAgent().random,
-                    locale="en-US"
-                )
-
-                page = await context.new_page()
-
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
+
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                locale="en-US"
+            ) as page:
                 await page.set_extra_http_headers({
                     "User-Agent": UserAgent().random,
                     "Accept-Language": "en-US,en;q=0.9",
@@ -78,53 +75,32 @@ class FishKeeperETL(PetProductsETL):
                     "Referer": url,
                 })
 
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
                 await page.wait_for_selector(selector, timeout=30000)
 
-                for _ in range(random.randint(3, 6)):
-                    await page.mouse.wheel(0, random.randint(300, 700))
-                    await asyncio.sleep(random.uniform(0.5, 1))
-
-                for _ in range(random.randint(5, 10)):
-                    await page.mouse.move(random.randint(0, 800), random.randint(0, 600))
-                    await asyncio.sleep(random.uniform(0.5, 1))
+                await self.humanize(page)
 
                 rendered_html = await page.content()
+                self.write_cache("GET", url, rendered_html.encode())
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 soup = BeautifulSoup(rendered_html, "html.parser")
                 return soup
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
-
     async def product_list_scroll(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    user_agent=UserAgent().random,
-                    viewport={"width": random.randint(
-                        1200, 1600), "height": random.randint(800, 1200)},
-                    locale="en-US"
-                )
-
-                page = await context.new_page()
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                viewport={"width": random.randint(
+                    1200, 1600), "height": random.randint(800, 1200)},
+                locale="en-US"
+            ) as page:
                 await page.set_extra_http_headers({
                     "User-Agent": UserAgent().random,
                     "Accept-Language": "en-US,en;q=0.9",
@@ -132,7 +108,9 @@ class FishKeeperETL(PetProductsETL):
                     "Referer": url,
                 })
 
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
                 await page.wait_for_selector(selector, timeout=30000)
 
                 logger.info(
@@ -153,18 +131,68 @@ class FishKeeperETL(PetProductsETL):
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 soup = BeautifulSoup(rendered_html, "html.parser")
                 return soup.find('ol', class_="ais-InfiniteHits-list")
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
+    async def collect_product_links(self, url, selector) -> list:
+        # Reads the product urls from the Algolia responses behind "load more" and
+        # stops on the last result page, without rendering or parsing the list
+        try:
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                viewport={"width": random.randint(
+                    1200, 1600), "height": random.randint(800, 1200)},
+                locale="en-US"
+            ) as page:
+                await page.set_extra_http_headers({
+                    "User-Agent": UserAgent().random,
+                    "Accept-Language": "en-US,en;q=0.9",
+                    "Origin": "https://www.fishkeeper.co.uk",
+                    "Referer": url,
+                })
+
+                async with capture_responses(page, lambda response_url: ALGOLIA_QUERIES in response_url) as capture:
+                    await self.throttle_async(url)
+                    response = await page.goto(url, wait_until="domcontentloaded")
+                    await self.raise_for_block(url, page, response)
+                    await page.wait_for_selector(selector, timeout=30000)
+
+                    urls = []
+                    seen = 0
+                    while await capture.wait(seen, ALGOLIA_TIMEOUT):
+                        exhausted = False
+                        for body in capture.bodies[seen:]:
+                            # The first result is the listing, the others are facet counts
+                            result = body["results"][0]
+                            urls.extend(hit["url"]
+                                        for hit in result["hits"] if hit.get("url"))
+                            exhausted = result["page"] + 1 >= result["nbPages"]
+                        seen = len(capture.bodies)
+
+                        if exhausted:
+                            break
+
+                        load_more = await page.query_selector('.ais-InfiniteHits-loadMore:not([disabled])')
+                        if load_more is None:
+                            break
+
+                        logger.info("Expanding Product List")
+                        await load_more.click()
+
+                logger.info(
+                    f"Collected {len(urls)} product urls from {seen} Algolia responses at {url}")
+                return list(dict.fromkeys(urls))
+
+        except Exception as e:
+            logger.error(f"An error occurred: {e}")
+
+    async def feefo_lookup(self, soup: BeautifulSoup):
+        data = json.loads(soup.select_one(
+            "script[type*='application/ld+json']").text)
+        await get_feefo_client().prefetch_product_rating(FEEFO_MERCHANT, data["mpn"])
 
     def transform(self, soup: BeautifulSoup, url: str):
         try:
@@ -173,15 +201,10 @@ class FishKeeperETL(PetProductsETL):
             product_title = data["name"]
 
             rating = 0
-            sku = data["mpn"]
-            rating_wrapper = requests.get(
-                f"https://api.feefo.com/api/10/products/ratings?merchant_identifier=maidenhead-aquatics&review_count=true&product_sku={sku}")
-            if rating_wrapper.status_code == 200:
-                json_data = rating_wrapper.json()
-                products = json_data.get('products', [])
-
-                if products and 'rating' in products[0]:
-                    rating = float(products[0]['rating'])
+            feefo_rating = get_feefo_client().product_rating(
+                FEEFO_MERCHANT, data["mpn"])
+            if feefo_rating is not None:
+                rating = float(feefo_rating)
 
             description = data["description"]
             product_url = url.replace(self.BASE_URL, "")
@@ -226,7 +249,7 @@ class FishKeeperETL(PetProductsETL):
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
 
-    def get_links(self, category: str) -> pd.DataFrame:
+    async def get_links_async(self, category: str) -> pd.DataFrame:
 
         if category not in self.CATEGORIES:
             raise ValueError(
@@ -234,17 +257,20 @@ class FishKeeperETL(PetProductsETL):
 
         url = self.BASE_URL + category
 
-        soup_pagination = asyncio.run(
-            self.product_list_scroll(url, '.ais-InfiniteHits-list'))
-        urls = [product.find('a').get('href') for product in soup_pagination.find_all(
-            'li', class_="ais-InfiniteHits-item")]
+        urls = await self.collect_product_links(
+            url, '.ais-InfiniteHits-list')
+        if not urls:
+            # Falls back to expanding and parsing the rendered list
+            soup_pagination = await self.product_list_scroll(url, '.ais-InfiniteHits-list')
+            urls = [product.find('a').get('href') for product in soup_pagination.find_all(
+                'li', class_="ais-InfiniteHits-item")]
 
         df = pd.DataFrame({"url": urls})
         df.insert(0, "shop", self.SHOP)
         return df
 
-    def image_scrape_product(self, url):
-        soup = asyncio.run(self.product_list_scroll(url, '#maincontent'))
+    async def image_scrape_product_async(self, url):
+        soup = await self.product_list_scroll(url, '#maincontent')
 
         return {
             'shop': self.SHOP,
@@ -9,6 +9,7 @@ from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .fetchers import BROWSER, HTTP
 from tenacity import before_sleep_log, retry, retry_if_exception_type, stop_after_attempt, wait_random
 
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
@@ -16,11 +17,6 @@ from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 
 from fake_useragent import UserAgent
 
-import asyncio
-import nest_asyncio
-from playwright.async_api import async_playwright
-nest_asyncio.apply()
-
 MAX_RETRIES = 10
 MAX_WAIT_BETWEEN_REQ = 1
 MIN_WAIT_BETWEEN_REQ = 0.5
@@ -33,6 +29,9 @@ class HarringtonsETL(PetProductsETL):
         super().__init__()
         self.SHOP = "Harringtons"
         self.BASE_URL = "https://www.harringtonspetfood.com"
+        self.FETCH_TIERS = [HTTP, BROWSER]
+        self.PRODUCT_SELECTOR = 'h1.header-product__heading'
+        self.pace(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
         self.CATEGORIES = ["/collections/harringtons-dog-food",
                            "/collections/harringtons-cat-food"]
 
@@ -45,25 +44,17 @@ class HarringtonsETL(PetProductsETL):
         reraise=True,
     )
     async def extract_scrape_content(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    user_agent=UserAgent().random,
-                    viewport={"width": random.randint(
-                        1200, 1600), "height": random.randint(800, 1200)},
-                    locale="en-US"
-                )
-
-                page = await context.new_page()
-
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
+
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                viewport={"width": random.randint(
+                    1200, 1600), "height": random.randint(800, 1200)},
+                locale="en-US"
+            ) as page:
                 await page.set_extra_http_headers({
                     "User-Agent": UserAgent().random,
                     "Accept-Language": "en-US,en;q=0.9",
@@ -72,33 +63,23 @@ class HarringtonsETL(PetProductsETL):
                     "Request-Origin": "gi"
                 })
 
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
                 await page.wait_for_selector(selector, timeout=30000)
 
-                for _ in range(random.randint(3, 6)):
-                    await page.mouse.wheel(0, random.randint(300, 700))
-                    await asyncio.sleep(random.uniform(0.5, 1))
-
-                for _ in range(random.randint(5, 10)):
-                    await page.mouse.move(random.randint(0, 800), random.randint(0, 600))
-                    await asyncio.sleep(random.uniform(0.5, 1))
+                await self.humanize(page)
 
                 rendered_html = await page.content()
+                self.write_cache("GET", url, rendered_html.encode())
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 return BeautifulSoup(rendered_html, "html.parser")
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
-
     def transform(self, soup: BeautifulSoup, url: str):
         try:
             product_name = soup.find(
@@ -190,7 +171,7 @@ class HarringtonsETL(PetProductsETL):
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
 
-    def get_links(self, category: str) -> pd.DataFrame:
+    async def get_links_async(self, category: str) -> pd.DataFrame:
         if category not in self.CATEGORIES:
             raise ValueError(
                 f"Invalid category. Value must be in {self.CATEGORIES}")
@@ -199,16 +180,15 @@ class HarringtonsETL(PetProductsETL):
         category_link = f"{self.BASE_URL}{category}"
 
         urls = []
-        soup = asyncio.run(self.extract_scrape_content(
-            category_link, '#MainContent'))
+        soup = await self.extract_scrape_content(
+            category_link, '#MainContent')
 
         n_product = int(soup.find(
             'span', class_="boost-pfs-filter-total-product").find(string=True, recursive=False))
         pagination_length = math.ceil(n_product / 24)
 
         for i in range(1, pagination_length + 1):
-            soup_pagination = asyncio.run(
-                self.extract_scrape_content(f"{category_link}?page={i}", '#MainContent'))
+            soup_pagination = await self.extract_scrape_content(f"{category_link}?page={i}", '#MainContent')
             for prod_list in soup_pagination.find_all('li', class_="list-product-card__item"):
                 urls.append(self.BASE_URL + prod_list.find('a',
                             class_="card-product__heading-link").get('href').replace('#', ''))
@@ -217,41 +197,8 @@ class HarringtonsETL(PetProductsETL):
         df.insert(0, "shop", self.SHOP)
         return df
 
-    def refresh_links(self, db_conn: Engine, table_name: str):
-        execute_query(db_conn, f"TRUNCATE TABLE {table_name};")
-
-        for category in self.CATEGORIES:
-            df = self.get_links(category)
-            if df is not None:
-                self.load(df, db_conn, table_name)
-
-        sql = get_sql_from_file("insert_into_urls.sql")
-        execute_query(db_conn, sql)
-
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
-
-        for i, row in df_urls.iterrows():
-
-            pkey = row["id"]
-            url = row["url"]
-
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = asyncio.run(
-                self.extract_scrape_content(url, "#MainContent"))
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
-
-    def image_scrape_product(self, url):
-        soup = asyncio.run(self.extract_scrape_content(url, '#MainContent'))
+    async def image_scrape_product_async(self, url):
+        soup = await self.extract_scrape_content(url, '#MainContent')
 
         return {
             'shop': self.SHOP,
@@ -5,6 +5,7 @@ from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .fingerprint import hash_fragments
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 
 
@@ -17,10 +18,17 @@ class JollyesETL(PetProductsETL):
         self.CATEGORIES = ["dog", "cat", "small-pet",
                            "bird-wildlife", "fish", "reptile"]
 
+    def get_product_data(self, soup: BeautifulSoup) -> dict:
+        return json.loads(soup.select_one(
+            "section[class*='lazy-review-section']").select_one("script[type*='application']").text)
+
+    def fingerprint(self, soup: BeautifulSoup) -> str:
+        data = self.get_product_data(soup)
+        return hash_fragments(data["name"], data["description"], data.get("aggregateRating"), data["offers"]["price"], data["image"])
+
     def transform(self, soup: BeautifulSoup, url: str) -> pd.DataFrame:
         try:
-            data = json.loads(soup.select_one(
-                "section[class*='lazy-review-section']").select_one("script[type*='application']").text)
+            data = self.get_product_data(soup)
 
             # Get data from parsed JSON
             product_title = data["name"]
@@ -1,6 +1,5 @@
 import requests
 import random
-import time
 import pandas as pd
 
 from datetime import datetime as dt
@@ -8,21 +7,39 @@ from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .fetchers import BROWSER, HTTP
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 from tenacity import before_sleep_log, retry, retry_if_exception_type, stop_after_attempt, wait_random
 
 from fake_useragent import UserAgent
 
-import asyncio
-import nest_asyncio
-from playwright.async_api import async_playwright
-nest_asyncio.apply()
+from .browser import capture_responses
 
 
 MAX_RETRIES = 10
 MAX_WAIT_BETWEEN_REQ = 1
 MIN_WAIT_BETWEEN_REQ = 0.5
 REQUEST_TIMEOUT = 30
+# Product tiles are filled in from this API as they scroll into view
+PRODUCTS_API = "/webshop/api/v1/products"
+PRODUCT_LINKS_SCRIPT = """items => items
+    .map(item => item.querySelector('a'))
+    .filter(a => a)
+    .map(a => a.getAttribute('href'))"""
+PRODUCT_TILES = "ul.fops-regular li.fops-item:not(.fops-item--advert)"
+# Tiles only get their link once their product has been loaded
+FILLED_TILES_SCRIPT = "selector => document.querySelectorAll(`${selector} a`).length"
+TILES_FILLED_SCRIPT = "([selector, n]) => document.querySelectorAll(`${selector} a`).length >= n"
+UNFILLED_IN_VIEW_SCRIPT = """selector => [...document.querySelectorAll(selector)]
+    .filter(item => !item.querySelector('a'))
+    .some(item => {
+        const rect = item.getBoundingClientRect();
+        return rect.bottom > 0 && rect.top < window.innerHeight;
+    })"""
+AT_BOTTOM_SCRIPT = "() => window.innerHeight + window.scrollY >= document.body.scrollHeight - 1"
+# How long a one-screen jump may take to fill in new tiles
+SCROLL_TIMEOUT = 5
+MAX_STALLED_SCROLLS = 2
 
 
 class OcadoETL(PetProductsETL):
@@ -31,6 +48,9 @@ class OcadoETL(PetProductsETL):
         super().__init__()
         self.SHOP = "Ocado"
         self.BASE_URL = "https://www.ocado.com"
+        self.FETCH_TIERS = [HTTP, BROWSER]
+        self.PRODUCT_SELECTOR = 'header.bop-title h1'
+        self.pace(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
         self.CATEGORIES = ["/browse/pets-home-garden-300818"]
 
     @retry(
@@ -42,25 +62,17 @@ class OcadoETL(PetProductsETL):
         reraise=True,
     )
     async def extract_scrape_content(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    user_agent=UserAgent().random,
-                    viewport={"width": random.randint(
-                        1200, 1600), "height": random.randint(800, 1200)},
-                    locale="en-US"
-                )
-
-                page = await context.new_page()
-
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
+
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                viewport={"width": random.randint(
+                    1200, 1600), "height": random.randint(800, 1200)},
+                locale="en-US"
+            ) as page:
                 await page.set_extra_http_headers({
                     "User-Agent": UserAgent().random,
                     "Accept-Language": "en-US,en;q=0.9",
@@ -68,53 +80,56 @@ class OcadoETL(PetProductsETL):
                     "Referer": url,
                 })
 
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
                 await page.wait_for_selector(selector, timeout=30000)
 
-                for _ in range(random.randint(3, 6)):
-                    await page.mouse.wheel(0, random.randint(300, 700))
-                    await asyncio.sleep(random.uniform(0.5, 1))
-
-                for _ in range(random.randint(5, 10)):
-                    await page.mouse.move(random.randint(0, 800), random.randint(0, 600))
-                    await asyncio.sleep(random.uniform(0.5, 1))
+                await self.humanize(page)
 
                 rendered_html = await page.content()
+                self.write_cache("GET", url, rendered_html.encode())
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 soup = BeautifulSoup(rendered_html, "html.parser")
                 return soup
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
+    def count_products(self, bodies: list) -> int:
+        count = 0
+        for body in bodies:
+            products = body if isinstance(body, list) else body.get("products", [])
+            count += sum(1 for product in products if isinstance(product, dict) and "sku" in product)
+
+        return count
+
+    async def wait_for_tiles(self, page, n: int) -> bool:
+        # Awaits the tiles instead of sleeping a fixed time per step, and only
+        # while some placeholder in view is still waiting for its product
+        if not await page.evaluate(UNFILLED_IN_VIEW_SCRIPT, PRODUCT_TILES):
+            return await page.evaluate(TILES_FILLED_SCRIPT, [PRODUCT_TILES, n])
 
-    async def product_list_scrolling(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    user_agent=UserAgent().random,
-                    viewport={"width": random.randint(
-                        1200, 1600), "height": random.randint(800, 1200)},
-                    locale="en-US"
-                )
+            await page.wait_for_function(TILES_FILLED_SCRIPT, arg=[PRODUCT_TILES, n], timeout=SCROLL_TIMEOUT * 1000)
+            return True
+
+        except Exception:
+            return False
 
-                page = await context.new_page()
+    async def product_list_scrolling(self, url, selector, n_product: int = None):
+        # Returns the product hrefs. Scrolling stops once the products API has
+        # delivered every product of the category, and only the links are read
+        # from the page instead of serializing the whole DOM.
+        try:
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                viewport={"width": random.randint(
+                    1200, 1600), "height": random.randint(800, 1200)},
+                locale="en-US"
+            ) as page:
                 await page.set_extra_http_headers({
                     "User-Agent": UserAgent().random,
                     "Accept-Language": "en-US,en;q=0.9",
@@ -122,60 +137,69 @@ class OcadoETL(PetProductsETL):
                     "Referer": url,
                 })
 
-                await page.goto(url, wait_until="domcontentloaded")
-                await page.wait_for_selector(selector, timeout=30000)
-
-                logger.info(
-                    "Starting to scrape the product list (Infinite scroll scrape)...")
-
-                scroll_step = 300
-                scroll_delay = 1
-
-                current_position = 0
-                page_height = await page.evaluate('() => document.body.scrollHeight')
-
-                while current_position < page_height:
-                    # Scroll to the current position
-                    await page.evaluate(f'window.scrollTo(0, {current_position})')
-                    current_position += scroll_step
-                    time.sleep(scroll_delay)
-
-                logger.info("Scraping complete. Extracting content...")
-
-                rendered_html = await page.content()
+                async with capture_responses(page, lambda response_url: PRODUCTS_API in response_url) as capture:
+                    await self.throttle_async(url)
+                    response = await page.goto(url, wait_until="domcontentloaded")
+                    await self.raise_for_block(url, page, response)
+                    await page.wait_for_selector(selector, timeout=30000)
+
+                    logger.info(
+                        "Starting to scrape the product list (Infinite scroll scrape)...")
+
+                    filled = await page.evaluate(FILLED_TILES_SCRIPT, PRODUCT_TILES)
+                    stalled = 0
+                    jumps = 0
+                    while stalled < MAX_STALLED_SCROLLS:
+                        # The API answering is not enough: the links are read from the tiles,
+                        # and those still empty once it is done are filled in by scrolling on
+                        if n_product and self.count_products(capture.bodies) >= n_product \
+                                and await self.wait_for_tiles(page, n_product):
+                            logger.info(
+                                f"All {n_product} products loaded after {len(capture.bodies)} API responses")
+                            break
+
+                        # One screen at a time, so that no tile is scrolled past unfilled
+                        await page.evaluate("window.scrollBy(0, window.innerHeight)")
+                        jumps += 1
+                        grew = await self.wait_for_tiles(page, filled + 1)
+                        filled = await page.evaluate(FILLED_TILES_SCRIPT, PRODUCT_TILES)
+
+                        # Only a jump at the bottom of the page that fills nothing in is a stall
+                        if grew:
+                            stalled = 0
+                        elif await page.evaluate(AT_BOTTOM_SCRIPT):
+                            stalled += 1
+
+                    filled = await page.evaluate(FILLED_TILES_SCRIPT, PRODUCT_TILES)
+                    logger.info(
+                        f"Scrolled {jumps} times to fill in {filled} product tiles")
+
+                logger.info("Scraping complete. Extracting links...")
+
+                links = await page.eval_on_selector_all(
+                    PRODUCT_TILES, PRODUCT_LINKS_SCRIPT)
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
-                soup = BeautifulSoup(rendered_html, "html.parser")
-                return soup.find('ul', class_="fops-regular")
+                return links
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
-
-    def get_links(self, category: str) -> pd.DataFrame:
+    async def get_links_async(self, category: str) -> pd.DataFrame:
         if category not in self.CATEGORIES:
             raise ValueError(
                 f"Invalid category. Value must be in {self.CATEGORIES}")
 
         category_link = f"{self.BASE_URL}{category}"
-        soup = asyncio.run(self.extract_scrape_content(
-            category_link, '.main-column'))
+        soup = await self.extract_scrape_content(
+            category_link, '.main-column')
         n_product = int(soup.find('div', class_="main-column").find('div',
                         class_="total-product-number").find('span').get_text().replace(' products', ''))
 
-        list_soup_product = asyncio.run(self.product_list_scrolling(
-            f"{category_link}?display={n_product}", '.fops-regular'))
-        product_list = [item for item in list_soup_product.find_all(
-            'li', class_="fops-item") if 'fops-item--advert' not in item.get('class', [])]
-        urls = [self.BASE_URL + product.find('a').get('href')
-                for product in product_list if product.find('a')]
+        links = await self.product_list_scrolling(
+            f"{category_link}?display={n_product}", '.fops-regular', n_product)
+        urls = [self.BASE_URL + link for link in links]
 
         df = pd.DataFrame({"url": urls})
         df.insert(0, "shop", self.SHOP)
@@ -245,39 +269,6 @@ class OcadoETL(PetProductsETL):
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
 
-    def refresh_links(self, db_conn: Engine, table_name: str):
-        execute_query(db_conn, f"TRUNCATE TABLE {table_name};")
-
-        for category in self.CATEGORIES:
-            df = self.get_links(category)
-            if df is not None:
-                self.load(df, db_conn, table_name)
-
-        sql = get_sql_from_file("insert_into_urls.sql")
-        execute_query(db_conn, sql)
-
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
-
-        for i, row in df_urls.iterrows():
-
-            pkey = row["id"]
-            url = row["url"]
-
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = asyncio.run(
-                self.extract_scrape_content(url, '#main-content'))
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
-
     def image_scrape_product(self, url):
         soup = self.extract_from_url("GET", url)
 
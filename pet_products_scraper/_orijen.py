@@ -1,4 +1,3 @@
-import requests
 import json
 import pandas as pd
 from datetime import datetime
@@ -6,8 +5,12 @@ from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .feefo import get_feefo_client
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 
+FEEFO_MERCHANT = "orijen-pet-foods"
+FEEFO_ORIGIN = "www.orijenpetfoods.co.uk"
+
 
 class OrijenETL(PetProductsETL):
 
@@ -15,6 +18,8 @@ class OrijenETL(PetProductsETL):
         super().__init__()
         self.SHOP = "Orijen"
         self.BASE_URL = "https://www.orijenpetfoods.co.uk"
+        self.FEEFO_MERCHANT = FEEFO_MERCHANT
+        self.FEEFO_ORIGIN = FEEFO_ORIGIN
         self.CATEGORIES = [
             "/product-category/dog-food/",
             "/product-category/dog-food/puppy-food/",
@@ -22,6 +27,9 @@ class OrijenETL(PetProductsETL):
             "/product-category/cat-food/kitten-food/",
         ]
 
+    def get_rating_sku(self, soup: BeautifulSoup) -> str:
+        return soup.find('input', attrs={'name': 'product_id'}).get('value')
+
     def transform(self, soup: BeautifulSoup, url: str):
         try:
             product_name = soup.find('h1', class_="product_title").get_text()
@@ -29,13 +37,10 @@ class OrijenETL(PetProductsETL):
                 'div', class_="badges-and-information__description").get_text(strip=True)
             product_url = url.replace(self.BASE_URL, "")
             product_rating = '0/5'
-            product_id = soup.find(
-                'input', attrs={'name': 'product_id'}).get('value')
-
-            rating_wrapper = requests.get(
-                f"https://api.feefo.com/api/10/reviews/summary/product?since_period=ALL&parent_product_sku={product_id}&merchant_identifier=orijen-pet-foods&origin=www.orijenpetfoods.co.uk")
-            rating = rating_wrapper.json()['rating']['rating']
-            product_rating = f'{rating}/5'
+            rating = get_feefo_client().summary_rating(
+                FEEFO_MERCHANT, FEEFO_ORIGIN, self.get_rating_sku(soup))
+            if rating is not None:
+                product_rating = f'{rating}/5'
 
             variants = []
             prices = []
@@ -1,11 +1,14 @@
+import asyncio
+import time
+from collections import deque
 import requests
 import pandas as pd
 from datetime import datetime as dt
 from abc import ABC, abstractmethod
 from bs4 import BeautifulSoup
-from sqlalchemy import Engine
+from requests.adapters import HTTPAdapter
+from sqlalchemy import Engine, bindparam, text
 from loguru import logger
-import undetected_chromedriver as uc
 from tenacity import (
     before_sleep_log,
     retry,
@@ -13,14 +16,35 @@ from tenacity import (
     stop_after_attempt,
     wait_random,
 )
-import random
 
-from .utils import execute_query, get_sql_from_file, update_url_scrape_status
+from .breaker import CircuitBreaker, get_circuit_breaker
+from .browser import ResourceBlocking, close_browser_pool, get_browser_pool
+from .cache import CacheMiss, as_response, get_response_cache
+from .concurrency import BLOCK_STATUS_CODES, AdaptiveConcurrency, BlockedError, is_blocked, report_block, watch_blocks
+from .feefo import get_feefo_client
+from .fetchers import FETCHERS, HTTP, SessionPool, get_tier_memory
+from .humanize import ADAPTIVE, FULL, NONE, get_stealth_override, humanize
+from .loader import BufferedLoader, FLUSH_SIZE
+from .revalidation import get_validators, revalidate
+from .throttle import BURST, REQUESTS_PER_SECOND, get_host, get_rate_limiter
+from .utils import clear_shop_staging, execute_query, get_sql_from_file
 
 MAX_RETRIES = 10
 MAX_WAIT_BETWEEN_REQ = 2
 MIN_WAIT_BETWEEN_REQ = 0
 REQUEST_TIMEOUT = 30
+MAX_CONCURRENCY = 8
+# Products in flight for shops paced by their old waits between requests
+PACED_CONCURRENCY = 2
+LINK_QUEUE_SIZE = 1000
+URL_COLUMNS = ["id", "url", "etag", "last_modified", "fingerprint"]
+HANDOFF_IDENTITY_SCRIPT = """() => ({
+    userAgent: navigator.userAgent,
+    languages: navigator.languages,
+    brands: navigator.userAgentData ? navigator.userAgentData.brands : null,
+    mobile: navigator.userAgentData ? navigator.userAgentData.mobile : false,
+    platform: navigator.userAgentData ? navigator.userAgentData.platform : null,
+})"""
 
 
 class PetProductsETL(ABC):
@@ -29,8 +53,345 @@ class PetProductsETL(ABC):
         self.SHOP = ""
         self.BASE_URL = ""
         self.CATEGORIES = []
+        # Upper bound for the adaptive number of products in flight
+        self.CONCURRENCY = MAX_CONCURRENCY
+        # Requests per second and burst allowed per host, shared by all workers
+        self.RATE_LIMIT = (REQUESTS_PER_SECOND, BURST)
+        # Transports tried cheapest first (see fetchers.py); a block or a page
+        # without PRODUCT_SELECTOR moves a product page on to the next one
+        self.FETCH_TIERS = [HTTP]
+        self.PRODUCT_SELECTOR = None
+        self.fetchers = {}
+        self.scrapers = SessionPool(
+            self.setup_cloudscraper, MAX_CONCURRENCY, "cloudscraper")
+        # How much scrolling and mouse movement browser pages get (see humanize.py)
+        self.STEALTH = ADAPTIVE
+        self.blocked_once = False
+        # Requests aborted in browser pages; None loads everything
+        self.RESOURCE_BLOCKING = ResourceBlocking()
+        # Page whose browser challenge is solved once and handed to self.session
+        self.HANDOFF_URL = None
+        self.HANDOFF_CONTEXT = {"locale": "en-US"}
+        # Shops embedding the Feefo widget have their rating looked up next to the
+        # page fetch (see feefo_lookup), so that transform finds it cached
+        self.FEEFO_MERCHANT = None
+        self.FEEFO_ORIGIN = None
+        self.handoff_headers = {}
+        self.handoff_at = None
+        self._handoff_lock = None
+        self._handoff_loop = None
 
-    def extract_from_driver(self, url: str) -> uc.Chrome:
+    def pace(self, min_wait: float, max_wait: float, concurrency: int = PACED_CONCURRENCY):
+        # Shops that used to sleep a random min_wait..max_wait between requests keep
+        # that average rate per host, with a few products in flight to overlap waits
+        self.RATE_LIMIT = (2 / (min_wait + max_wait), 1)
+        self.CONCURRENCY = concurrency
+
+    def throttle(self, url: str):
+        # The token wait sleeps, so coroutines reach request() through asyncio.to_thread
+        # or use throttle_async; on the loop it would freeze every worker
+        try:
+            asyncio.get_running_loop()
+            logger.warning(f"Blocking request of {url} made on the event loop")
+
+        except RuntimeError:
+            pass
+
+        get_rate_limiter().wait(get_host(url), *self.RATE_LIMIT)
+
+    async def throttle_async(self, url: str):
+        await get_rate_limiter().wait_async(get_host(url), *self.RATE_LIMIT)
+
+    def replaying(self) -> bool:
+        cache = get_response_cache()
+        return cache is not None and cache.replay
+
+    def read_cache(self, method: str, url: str, body: dict = None) -> bytes:
+        # Only serves responses while replaying, and then a miss must not fall back to the network
+        if not self.replaying():
+            return None
+
+        content = get_response_cache().get(method, url, body)
+        if content is None:
+            raise CacheMiss(f"{method} {url} is not in the response cache")
+
+        return content
+
+    def write_cache(self, method: str, url: str, content: bytes, body: dict = None):
+        cache = get_response_cache()
+        if cache is not None and cache.record:
+            cache.put(method, url, content, body)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        body = {key: kwargs[key]
+                for key in ("params", "data", "json") if kwargs.get(key)}
+        cached = self.read_cache(method, url, body)
+        if cached is not None:
+            return as_response(url, cached)
+
+        validators = get_validators(url)
+        if validators is not None:
+            kwargs["headers"] = {
+                **(kwargs.get("headers") or {}), **validators.headers()}
+
+        if self.handoff_headers:
+            # Cookies from the browser only hold with the identity that earned them
+            kwargs["headers"] = {
+                **(kwargs.get("headers") or {}), **self.handoff_headers}
+
+        self.throttle(url)
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        response = self.session.request(method=method, url=url, **kwargs)
+        self.check_response(url, response.status_code, response.headers)
+        if validators is not None:
+            validators.update(response.status_code, response.headers)
+        if response.status_code == 200:
+            self.write_cache(method, url, response.content, body)
+
+        return response
+
+    def stealth_profile(self) -> str:
+        profile = get_stealth_override() or self.STEALTH
+        if profile == ADAPTIVE:
+            return FULL if self.blocked_once else NONE
+
+        return profile
+
+    async def humanize(self, page):
+        await humanize(page, self.stealth_profile())
+
+    def browser_page(self, **context_options):
+        return get_browser_pool().page(blocking=self.RESOURCE_BLOCKING, **context_options)
+
+    async def browser_handoff(self, rejected_at: float = None):
+        # Solves the shop's challenge in a browser and exports its cookies, user agent
+        # and client hints into self.session. Only solved again once the session has
+        # been rejected after the last handoff.
+        loop = asyncio.get_running_loop()
+        if self._handoff_loop is not loop:
+            self._handoff_lock = asyncio.Lock()
+            self._handoff_loop = loop
+
+        async with self._handoff_lock:
+            if self.handoff_at is not None and (rejected_at is None or self.handoff_at >= rejected_at):
+                return
+
+            async with self.browser_page(**self.HANDOFF_CONTEXT) as page:
+                await self.throttle_async(self.HANDOFF_URL)
+                response = await page.goto(self.HANDOFF_URL, wait_until="domcontentloaded")
+                await self.raise_for_block(self.HANDOFF_URL, page, response)
+                identity = await page.evaluate(HANDOFF_IDENTITY_SCRIPT)
+                cookies = await page.context.cookies(self.HANDOFF_URL)
+
+            headers = {
+                "User-Agent": identity["userAgent"],
+                "Accept-Language": ",".join(identity["languages"]),
+            }
+            if identity["brands"]:
+                headers["Sec-Ch-Ua"] = ", ".join(
+                    f'"{brand["brand"]}";v="{brand["version"]}"' for brand in identity["brands"])
+                headers["Sec-Ch-Ua-Mobile"] = "?1" if identity["mobile"] else "?0"
+                headers["Sec-Ch-Ua-Platform"] = f'"{identity["platform"]}"'
+
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"])
+
+            self.handoff_headers = headers
+            self.handoff_at = time.monotonic()
+            logger.info(
+                f"Handed {len(cookies)} {self.SHOP} browser cookies to the HTTP session")
+
+    async def fetch_http(self, url: str, **kwargs) -> requests.Response:
+        # Returns None when the session is still rejected after a fresh handoff
+        rejected_at = None
+        for _ in range(2):
+            try:
+                if self.HANDOFF_URL is not None and not self.replaying():
+                    await self.browser_handoff(rejected_at)
+
+                rejected_at = time.monotonic()
+                # A rejection that a fresh handoff gets past is not a block of the product
+                with watch_blocks() as blocked:
+                    response = await asyncio.to_thread(self.request, "GET", url, **kwargs)
+
+            except Exception as e:
+                logger.warning(f"Plain HTTP fetch of {url} failed: {e}")
+                return None
+
+            if response.status_code == 304:
+                return response
+
+            # Only a refusal or a challenge means the session was rejected; a dead
+            # or failing page is not worth solving the challenge again for
+            challenged = is_blocked(200, response.headers, response.text)
+            if response.status_code == 200 and not challenged:
+                return response
+
+            if response.status_code not in BLOCK_STATUS_CODES and not challenged:
+                logger.warning(
+                    f"Plain HTTP fetch of {url} returned {response.status_code}")
+                if blocked.is_set():
+                    # A 5xx still tells the concurrency controller to back off
+                    report_block()
+                return None
+
+            if self.HANDOFF_URL is None:
+                break
+
+        logger.warning(f"{url} is still rejected over plain HTTP")
+        return None
+
+    async def fetch_page(self, url: str, **kwargs) -> BeautifulSoup:
+        # Shops with a handoff try the handed-off session first; otherwise, and if
+        # that is rejected, the page goes through extract_from_url with its retries
+        if self.HANDOFF_URL is not None:
+            response = await self.fetch_http(url, **kwargs)
+            if response is not None:
+                logger.info(
+                    f"Successfully extracted data from {url} {response.status_code}")
+                return BeautifulSoup(response.content, "html.parser")
+
+        return await asyncio.to_thread(self.extract_from_url, "GET", url, **kwargs)
+
+    async def fetch_escalating(self, url: str, selector: str = None, remember: bool = True, **kwargs) -> BeautifulSoup:
+        # Starts at the tier that last worked for the host; the last tier's page
+        # is returned as is and left to transform. Secondary fetches of a product
+        # pass remember=False, so they never move the host's pages to another tier.
+        memory = None if self.replaying() or len(
+            self.FETCH_TIERS) == 1 else get_tier_memory()
+        host = get_host(url)
+        remembered = memory.get(host) if memory is not None else None
+        start = self.FETCH_TIERS.index(
+            remembered) if remembered in self.FETCH_TIERS else 0
+
+        for tier in self.FETCH_TIERS[start:]:
+            last = tier == self.FETCH_TIERS[-1]
+            soup = await self.fetch_tier(tier, url, selector, fail_fast=not last, **kwargs)
+            validators = get_validators(url)
+            not_modified = validators is not None and validators.not_modified
+            found = soup is not None and (
+                not_modified or selector is None or soup.select_one(selector) is not None)
+
+            if found and remember and memory is not None and tier != remembered:
+                memory.remember(host, tier)
+                logger.info(f"{self.SHOP} pages of {host} now start on {tier}")
+
+            # Only a page accepted from plain HTTP may be revalidated next run;
+            # the validators of a rejected shell would answer 304 for it later
+            if validators is not None and not (found and tier == HTTP):
+                validators.discard()
+
+            if found or last:
+                return soup
+
+            logger.warning(f"{tier} fetch of {url} failed, escalating")
+
+    async def fetch_tier(self, tier: str, url: str, selector: str = None, fail_fast: bool = False, **kwargs) -> BeautifulSoup:
+        if tier not in self.fetchers:
+            self.fetchers[tier] = FETCHERS[tier](self)
+
+        fetcher = self.fetchers[tier]
+        if not fail_fast:
+            return await fetcher.fetch(url, selector, **kwargs)
+
+        # Blocks on a tier that can still escalate are not blocks of the product
+        with watch_blocks() as blocked:
+            try:
+                soup = await fetcher.fetch(url, selector, fail_fast=True, **kwargs)
+
+            except Exception as e:
+                logger.warning(f"{tier} fetch of {url} failed: {e}")
+                return None
+
+        return None if blocked.is_set() else soup
+
+    def check_response(self, url: str, status_code: int, headers: dict = None, text: str = "") -> bool:
+        blocked = is_blocked(status_code, headers, text)
+        if blocked:
+            logger.warning(f"Blocked response {status_code} from {url}")
+            report_block()
+
+        return blocked
+
+    async def raise_for_block(self, url: str, page, response):
+        # Fails fast instead of waiting for selectors that a challenge page never has
+        if response is not None and self.check_response(url, response.status, response.headers, await page.title()):
+            raise BlockedError(f"Blocked response {response.status} from {url}")
+
+    async def extract_scrape_content(self, url: str, selector: str = None) -> BeautifulSoup:
+        # Generic browser tier; shops with their own headers or waits override it
+        try:
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
+
+            async with self.browser_page(locale="en-US") as page:
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
+                if selector is not None:
+                    await page.wait_for_selector(selector, timeout=30000)
+
+                await self.humanize(page)
+
+                rendered_html = await page.content()
+                self.write_cache("GET", url, rendered_html.encode())
+                logger.info(f"Successfully extracted data from {url}")
+                return BeautifulSoup(rendered_html, "html.parser")
+
+        except Exception as e:
+            logger.error(f"An error occurred: {e}")
+
+    def setup_cloudscraper(self) -> "cloudscraper.CloudScraper":
+        # Only the shops behind Cloudflare pay for importing cloudscraper
+        import cloudscraper
+
+        return cloudscraper.create_scraper(browser="chrome")
+
+    @retry(
+        wait=wait_random(min=MIN_WAIT_BETWEEN_REQ, max=MAX_WAIT_BETWEEN_REQ),
+        stop=stop_after_attempt(MAX_RETRIES),
+        retry=retry_if_exception_type(requests.RequestException),
+        before_sleep=before_sleep_log(logger, "WARNING"),
+        reraise=True,
+    )
+    def extract_from_cloudscraper(self, url: str, headers: dict = None) -> BeautifulSoup:
+        try:
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
+
+            self.throttle(url)
+            scraper = self.scrapers.checkout()
+            rejected = False
+            try:
+                response = scraper.get(
+                    url, headers=headers, timeout=REQUEST_TIMEOUT)
+                # A 403 means the session's clearance is gone; other errors keep it
+                rejected = response.status_code == 403
+
+            finally:
+                self.scrapers.release(scraper, rejected)
+
+            # The circuit breaker backs off instead of retrying a Cloudflare challenge
+            if self.check_response(url, response.status_code, response.headers):
+                raise BlockedError("Cloudflare protection triggered.")
+
+            response.raise_for_status()
+
+            logger.info(
+                f"Successfully extracted data from {url} {response.status_code}"
+            )
+            self.write_cache("GET", url, response.content)
+            return BeautifulSoup(response.content, "html.parser")
+
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch {url}: {e}")
+
+    def extract_from_driver(self, url: str) -> "uc.Chrome":
+        # Only the shops that need a real Chrome pay for importing the driver
+        import undetected_chromedriver as uc
 
         try:
             driver = uc.Chrome(headless=True, use_subprocess=False)
@@ -52,16 +413,13 @@ class PetProductsETL(ABC):
     def extract_from_url(self, method: str, url: str, params: dict = None, data: dict = None, headers: dict = None, verify: bool = True) -> BeautifulSoup:
         try:
             # Parse request response
-            response = self.session.request(
-                method=method, url=url, params=params, data=data, headers=headers, verify=verify)
+            response = self.request(
+                method, url, params=params, data=data, headers=headers, verify=verify)
             response.raise_for_status()
             soup = BeautifulSoup(response.content, "html.parser")
             logger.info(
                 f"Successfully extracted data from {url} {response.status_code}"
             )
-            sleep_time = random.uniform(
-                MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-            logger.info(f"Sleeping for {sleep_time} seconds...")
             return soup
 
         except Exception as e:
@@ -90,39 +448,336 @@ class PetProductsETL(ABC):
             logger.error(e)
             raise e
 
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
+    async def fetch_product(self, url: str) -> BeautifulSoup:
+        soup = await self.fetch_escalating(url, self.PRODUCT_SELECTOR)
+        if self.FEEFO_MERCHANT is not None and self.has_body(soup, url):
+            try:
+                await self.feefo_lookup(soup)
 
-        for i, row in df_urls.iterrows():
+            except Exception as e:
+                # transform looks the rating up again and falls back to its default
+                logger.warning(f"Could not prefetch the Feefo rating of {url}: {e}")
 
-            pkey = row["id"]
-            url = row["url"]
+        return soup
 
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+    async def feefo_lookup(self, soup: BeautifulSoup):
+        # Shops keyed by another SKU, or using products/ratings, override this
+        await get_feefo_client().prefetch_summary(self.FEEFO_MERCHANT, self.FEEFO_ORIGIN, self.get_rating_sku(soup))
 
-            soup = self.extract_from_url("GET", url)
-            df = self.transform(soup, url)
+    def has_body(self, soup: BeautifulSoup, url: str) -> bool:
+        # The empty body of a 304 has nothing to read a shop's extras from
+        validators = get_validators(url)
+        return soup is not None and (validators is None or not validators.not_modified)
 
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
+    def fingerprint(self, soup: BeautifulSoup) -> str:
+        # Shops that can isolate the data transform reads return a hash of it
+        # (see fingerprint.hash_fragments), so that unchanged products are skipped
+        return None
 
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
+    async def scrape_product(self, pkey: int, url: str, loader: BufferedLoader, controller: AdaptiveConcurrency = None, retry_blocked: bool = False, etag: str = None, last_modified: str = None, fingerprint: str = None) -> bool:
+        now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+        start_time = time.monotonic()
+        fingerprint = fingerprint if isinstance(fingerprint, str) else None
+        digest = fingerprint
+        unchanged = False
 
-    @abstractmethod
-    def get_links(self) -> pd.DataFrame:
-        pass
+        with watch_blocks() as blocked, revalidate(url, etag, last_modified) as validators:
+            stored = (validators.etag, validators.last_modified)
+            try:
+                soup = await self.fetch_product(url)
+                # A 304 has no body: the rows loaded last time are still current
+                unchanged = validators.not_modified
+                if not unchanged:
+                    digest = self.safe_fingerprint(soup, url)
+                    # Replays exist to re-run the parsers, so they never skip
+                    unchanged = digest is not None and digest == fingerprint and not self.replaying()
 
-    def refresh_links(self, db_conn: Engine, table_name: str):
-        execute_query(db_conn, f"TRUNCATE TABLE {table_name};")
+                # Some transforms still make blocking requests of their own, which
+                # would hold up every other worker on the loop
+                df = None if unchanged else await asyncio.to_thread(self.transform, soup, url)
+
+            except Exception as e:
+                logger.error(f"Error scraping {url}: {e}")
+                df = None
+
+        if unchanged:
+            logger.info(f"{url} unchanged since the last scrape")
+            if controller is not None:
+                controller.record(time.monotonic() - start_time)
+
+            await loader.add_status(pkey, "DONE", now,
+                              validators.etag, validators.last_modified, digest)
+            return False
+
+        if controller is not None:
+            controller.record(time.monotonic() - start_time,
+                              blocked=blocked.is_set(), failed=df is None)
+
+        if blocked.is_set() and not self.blocked_once:
+            self.blocked_once = True
+            if (get_stealth_override() or self.STEALTH) == ADAPTIVE:
+                logger.warning(
+                    f"Turning on humanization for {self.SHOP} after a blocked request")
+
+        # Only products lost to a block count against the shop's circuit breaker
+        lost_to_block = df is None and blocked.is_set()
+
+        if df is not None:
+            await loader.add(df)
+            await loader.add_status(pkey, "DONE", now,
+                              validators.etag, validators.last_modified, digest)
+
+        elif not (lost_to_block and retry_blocked):
+            # Keeps the old validators, which still describe the rows in the database
+            await loader.add_status(pkey, "FAILED", now, *stored, fingerprint)
+
+        return lost_to_block
+
+    def safe_fingerprint(self, soup: BeautifulSoup, url: str) -> str:
+        # A page that cannot be fingerprinted is still worth a full transform
+        try:
+            return self.fingerprint(soup)
+
+        except Exception as e:
+            logger.warning(f"Could not fingerprint {url}: {e}")
+
+    def mount_adapter(self):
+        # Size the connection pool to the number of workers sharing the session
+        adapter = HTTPAdapter(
+            pool_connections=self.CONCURRENCY, pool_maxsize=self.CONCURRENCY)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.scrapers.size = self.CONCURRENCY
+
+    async def scrape_guarded(self, item: tuple, loader: BufferedLoader, controller: AdaptiveConcurrency, breaker: CircuitBreaker, retry_blocked: bool) -> bool:
+        pkey, url, *stored = item
+        async with controller.slot():
+            # Left unscraped if the shop stays blocked, so the next run picks them up
+            if not await breaker.acquire():
+                return False
+
+            blocked = await self.scrape_product(
+                pkey, url, loader, controller, retry_blocked, *stored)
+
+        breaker.record(blocked)
+        return blocked
+
+    async def scrape_queue(self, queue: asyncio.Queue, loader: BufferedLoader, controller: AdaptiveConcurrency, breaker: CircuitBreaker, retries: deque):
+        # Consumes URL_COLUMNS items until it gets None
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+
+            if await self.scrape_guarded(item, loader, controller, breaker, retry_blocked=True):
+                retries.append(item)
+
+        # Products lost to a block get one more attempt once everything else is done
+        while retries:
+            await self.scrape_guarded(retries.popleft(), loader, controller, breaker, retry_blocked=False)
+
+    async def run_async(self, db_conn: Engine, table_name: str, flush_size: int = FLUSH_SIZE):
+        cache = get_response_cache()
+        if cache is not None and cache.replay:
+            # Re-parse every stored product page of the shop, whatever its status
+            sql = get_sql_from_file("select_shop_urls.sql")
+            df_urls = self.extract_from_sql(db_conn, sql.format(shop=self.SHOP))
+            df_urls = df_urls[[cache.contains("GET", url)
+                               for url in df_urls["url"]]]
+
+        else:
+            sql = get_sql_from_file("select_unscraped_urls.sql")
+            sql = sql.format(shop=self.SHOP)
+            df_urls = self.extract_from_sql(db_conn, sql)
+        self.mount_adapter()
+
+        n_workers = max(1, min(self.CONCURRENCY, len(df_urls)))
+        queue = asyncio.Queue()
+        for item in df_urls[URL_COLUMNS].itertuples(index=False, name=None):
+            queue.put_nowait(item)
+
+        for _ in range(n_workers):
+            queue.put_nowait(None)
+
+        controller = AdaptiveConcurrency(self.SHOP, n_workers)
+        breaker = get_circuit_breaker(self.SHOP)
+        breaker.reset()
+        retries = deque()
+        logger.info(
+            f"Scraping {len(df_urls)} {self.SHOP} urls with up to {n_workers} workers")
+
+        start_time = time.monotonic()
+        async with BufferedLoader(db_conn, table_name, flush_size) as loader:
+            try:
+                await asyncio.gather(*(self.scrape_queue(queue, loader, controller, breaker, retries) for _ in range(n_workers)))
+
+            finally:
+                await close_browser_pool()
+                self.scrapers.close()
+
+        elapsed = time.monotonic() - start_time
+        controller.summary()
+
+        if elapsed > 0:
+            logger.info(
+                f"Scraped {len(df_urls)} {self.SHOP} urls in {elapsed:.1f}s ({len(df_urls) / elapsed * 60:.1f} urls/min)")
 
-        for category in self.CATEGORIES:
-            df = self.get_links(category)
-            if df is not None:
-                self.load(df, db_conn, table_name)
+    def run_sync(self, coroutine):
+        # The only way in from blocking code: the whole call runs on one loop, and
+        # the browsers opened on it are closed before it goes away
+        async def main():
+            try:
+                return await coroutine
+
+            finally:
+                await close_browser_pool()
+
+        return asyncio.run(main())
+
+    def run(self, db_conn: Engine, table_name: str, flush_size: int = FLUSH_SIZE):
+        self.run_sync(self.run_async(db_conn, table_name, flush_size))
+
+    # Shops implement either the blocking get_links, run in a worker thread, or
+    # get_links_async when they drive browser pages on the loop
+    def get_links(self, category: str) -> pd.DataFrame:
+        return self.run_sync(self.get_links_async(category))
+
+    async def get_links_async(self, category: str) -> pd.DataFrame:
+        if type(self).get_links is PetProductsETL.get_links:
+            raise NotImplementedError(
+                f"{type(self).__name__} implements neither get_links nor get_links_async")
+
+        return await asyncio.to_thread(self.get_links, category)
+
+    def image_scrape_product(self, url: str) -> dict:
+        return self.run_sync(self.image_scrape_product_async(url))
+
+    async def image_scrape_product_async(self, url: str) -> dict:
+        if type(self).image_scrape_product is PetProductsETL.image_scrape_product:
+            raise NotImplementedError(
+                f"{type(self).__name__} implements neither image_scrape_product nor image_scrape_product_async")
+
+        return await asyncio.to_thread(self.image_scrape_product, url)
+
+    def get_categories(self) -> list:
+        return self.CATEGORIES
+
+    async def refresh_links_async(self, db_conn: Engine, table_name: str):
+        # Categories are crawled CONCURRENCY at a time; the per-host rate limit
+        # still paces the requests they make
+        self.mount_adapter()
+        await asyncio.to_thread(clear_shop_staging, db_conn, table_name, self.SHOP)
+
+        # Some shops read their categories off the site
+        categories = await asyncio.to_thread(self.get_categories)
+        semaphore = asyncio.Semaphore(max(1, self.CONCURRENCY))
+        start_time = time.monotonic()
+
+        async def discover(category: str) -> pd.DataFrame:
+            async with semaphore:
+                try:
+                    return await self.get_links_async(category)
+
+                except Exception as e:
+                    logger.error(f"Error discovering {category}: {e}")
+
+        frames = [df for df in await asyncio.gather(*(discover(category) for category in categories))
+                  if df is not None and not df.empty]
+        n_links = 0
+        if frames:
+            # The same product is often listed under several categories
+            df = pd.concat(frames, ignore_index=True).drop_duplicates(subset="url")
+            n_links = len(df)
+            await asyncio.to_thread(self.load, df, db_conn, table_name)
+
+        logger.info(
+            f"Discovered {n_links} {self.SHOP} links in {len(categories)} categories in {time.monotonic() - start_time:.1f}s")
 
         sql = get_sql_from_file("insert_into_urls.sql")
-        execute_query(db_conn, sql)
+        await asyncio.to_thread(execute_query, db_conn, sql, {"shop": self.SHOP})
+
+    def refresh_links(self, db_conn: Engine, table_name: str):
+        self.run_sync(self.refresh_links_async(db_conn, table_name))
+
+    def stage_new_links(self, db_conn: Engine, links_table: str, df: pd.DataFrame) -> pd.DataFrame:
+        # Registers a category's links and returns the ones that still need scraping
+        self.load(df, db_conn, links_table)
+        execute_query(db_conn, get_sql_from_file(
+            "insert_into_urls.sql"), {"shop": self.SHOP})
+
+        sql = text(get_sql_from_file("select_unscraped_urls_in.sql")).bindparams(
+            bindparam("urls", expanding=True))
+        params = {"shop": self.SHOP, "urls": df["url"].drop_duplicates().tolist()}
+        with db_conn.connect() as conn:
+            return pd.DataFrame(conn.execute(sql, params).all(), columns=URL_COLUMNS)
+
+    async def run_pipeline_async(self, db_conn: Engine, table_name: str, links_table: str, flush_size: int = FLUSH_SIZE, queue_size: int = LINK_QUEUE_SIZE):
+        # get_links and scrape in one pass: products are scraped as soon as their
+        # category page is parsed instead of after the whole discovery phase
+        self.mount_adapter()
+        await asyncio.to_thread(clear_shop_staging, db_conn, links_table, self.SHOP)
+
+        n_workers = max(1, self.CONCURRENCY)
+        queue = asyncio.Queue(maxsize=queue_size)
+        controller = AdaptiveConcurrency(self.SHOP, n_workers)
+        breaker = get_circuit_breaker(self.SHOP)
+        breaker.reset()
+        retries = deque()
+        queued = set()
+        start_time = time.monotonic()
+
+        async def produce():
+            try:
+                for category in await asyncio.to_thread(self.get_categories):
+                    if breaker.gave_up:
+                        break
+
+                    try:
+                        df = await self.get_links_async(category)
+                        if df is None or df.empty:
+                            continue
+
+                        df_urls = await asyncio.to_thread(self.stage_new_links, db_conn, links_table, df)
+
+                    except Exception as e:
+                        logger.error(f"Error discovering {category}: {e}")
+                        continue
+
+                    for item in df_urls.itertuples(index=False, name=None):
+                        # The same product is often listed under several categories
+                        pkey = item[0]
+                        if pkey in queued:
+                            continue
+
+                        if not queued:
+                            logger.info(
+                                f"Queued the first {self.SHOP} url after {time.monotonic() - start_time:.1f}s")
+
+                        queued.add(pkey)
+                        await queue.put(item)
+
+            finally:
+                for _ in range(n_workers):
+                    await queue.put(None)
+
+        logger.info(
+            f"Streaming {self.SHOP} links into up to {n_workers} scrape workers")
+
+        async with BufferedLoader(db_conn, table_name, flush_size) as loader:
+            try:
+                await asyncio.gather(produce(), *(self.scrape_queue(queue, loader, controller, breaker, retries) for _ in range(n_workers)))
+
+            finally:
+                await close_browser_pool()
+                self.scrapers.close()
+
+        elapsed = time.monotonic() - start_time
+        controller.summary()
+
+        if elapsed > 0:
+            logger.info(
+                f"Discovered and scraped {len(queued)} {self.SHOP} urls in {elapsed:.1f}s ({len(queued) / elapsed * 60:.1f} urls/min)")
+
+    def run_pipeline(self, db_conn: Engine, table_name: str, links_table: str, flush_size: int = FLUSH_SIZE):
+        self.run_sync(self.run_pipeline_async(
+            db_conn, table_name, links_table, flush_size))
@@ -1,7 +1,9 @@
 import re
+import asyncio
 import pandas as pd
 import warnings
 from datetime import datetime as dt
+from urllib.parse import urljoin
 from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
@@ -27,6 +29,68 @@ class PetPlanetETL(PetProductsETL):
             "/d2709/pet_health"
         ]
 
+    def get_price(self, soup: BeautifulSoup) -> tuple:
+        price = soup.select_one("span[class*='fw-bold fs-4']")
+        if price is None:
+            price = soup.select_one("div[class*='fw-bold fs-4']")
+
+        original_price = price.select_one("span")
+        if original_price:
+            original_price_amount = float(
+                original_price.text.replace("£", ""))
+            discounted_price_amount = float(
+                price.contents[-1].strip().replace("£", ""))
+            discount_percentage = (
+                original_price_amount - discounted_price_amount) / original_price_amount
+        else:
+            original_price_amount = float(
+                price.contents[-1].strip().replace("£", ""))
+            discounted_price_amount = None
+            discount_percentage = None
+
+        return original_price_amount, discounted_price_amount, discount_percentage
+
+    def get_variant_price(self, product_variant) -> tuple:
+        # An option tile shows its price, or the old and the new price when on offer
+        amounts = [float(amount) for amount in re.findall(
+            r"£\s*(\d+(?:\.\d+)?)", product_variant.get_text(" "))]
+        if len(amounts) >= 2:
+            original_price_amount, discounted_price_amount = amounts[0], amounts[-1]
+            discount_percentage = (
+                original_price_amount - discounted_price_amount) / original_price_amount
+            return original_price_amount, discounted_price_amount, discount_percentage
+
+        if amounts:
+            return amounts[0], None, None
+
+        return None, None, None
+
+    def is_selected_variant(self, product_variant, url: str) -> bool:
+        classes = product_variant.get("class", [])
+        if "active" in classes or "selected" in classes:
+            return True
+
+        href = product_variant.get("href")
+        return bool(href) and urljoin(self.BASE_URL, href) == url
+
+    def fetch_variant_price(self, product_variant) -> tuple:
+        # Only for tiles without a price: the option's own page has its price block
+        href = product_variant.get("href")
+        if not href:
+            return None, None, None
+
+        variant_url = urljoin(self.BASE_URL, href)
+        soup = self.extract_from_url("GET", variant_url, verify=False)
+        if soup is None:
+            return None, None, None
+
+        try:
+            return self.get_price(soup)
+
+        except Exception as e:
+            logger.warning(f"No price found at {variant_url}: {e}")
+            return None, None, None
+
     def transform(self, soup: BeautifulSoup, url: str):
         try:
             # Get the product title, rating, and description
@@ -45,77 +109,46 @@ class PetPlanetETL(PetProductsETL):
             product_options = soup.select_one(
                 "div[class*='product-option-grid']")
 
-            # Placeholder for variant details
+            price, discounted_price, discount_percentage = self.get_price(soup)
+            image_url = ', '.join([img.get('src') for img in soup.find(
+                'div', class_="product-gallery-control").find_all('img')])
+
             variants = []
             prices = []
             discounted_prices = []
             discount_percentages = []
-            image_urls = []
 
             if product_options:
-                product_variants = product_options.find_all("a")
-
-                # Get the variant name, price, and discounted price
-                for product_variant in product_variants:
-                    variant = product_variant.select_one(
-                        "div[class*='h5']").text
-
-                    response_new = self.session.get(url, verify=False)
-                    soup_new = BeautifulSoup(response_new.content)
-
-                    price = soup_new.select_one("span[class*='fw-bold fs-4']")
-                    if price is None:
-                        price = soup_new.select_one(
-                            "div[class*='fw-bold fs-4']")
-
-                    original_price = price.select_one("span")
-                    if original_price:
-                        original_price_amount = float(
-                            original_price.text.replace("£", ""))
-                        discounted_price_amount = float(
-                            price.contents[-1].strip().replace("£", ""))
-                        discount_percentage = (
-                            original_price_amount - discounted_price_amount) / original_price_amount
+                for product_variant in product_options.find_all("a"):
+                    variant = product_variant.select_one("div[class*='h5']").text
+                    if self.is_selected_variant(product_variant, url):
+                        # The price block of the page belongs to the selected option
+                        variant_price = (
+                            price, discounted_price, discount_percentage)
                     else:
-                        original_price_amount = float(
-                            price.contents[-1].strip().replace("£", ""))
-                        discounted_price_amount = None
-                        discount_percentage = None
+                        variant_price = self.get_variant_price(product_variant)
+                        if variant_price[0] is None:
+                            variant_price = self.fetch_variant_price(
+                                product_variant)
+
+                    # An option whose price could not be had is left out
+                    if variant_price[0] is None:
+                        logger.warning(
+                            f"Could not price the {variant} option of {url}")
+                        continue
 
                     variants.append(variant)
-                    prices.append(original_price_amount)
-                    discounted_prices.append(discounted_price_amount)
-                    discount_percentages.append(discount_percentage)
-                    image_urls.append(', '.join([img.get('src') for img in soup.find(
-                        'div', class_="product-gallery-control").find_all('img')]))
+                    prices.append(variant_price[0])
+                    discounted_prices.append(variant_price[1])
+                    discount_percentages.append(variant_price[2])
 
             else:
-                variant = None
-
-                price = soup.select_one("span[class*='fw-bold fs-4']")
-                if price is None:
-                    price = soup.select_one("div[class*='fw-bold fs-4']")
-
-                original_price = price.select_one("span")
-                if original_price:
-                    original_price_amount = float(
-                        original_price.text.replace("£", ""))
-                    discounted_price_amount = float(
-                        price.contents[-1].strip().replace("£", ""))
-                    discount_percentage = (
-                        original_price_amount - discounted_price_amount) / original_price_amount
-                else:
-                    original_price_amount = float(
-                        price.contents[-1].strip().replace("£", ""))
-                    discounted_price_amount = None
-                    discount_percentage = None
-
-                variants.append(variant)
-                prices.append(original_price_amount)
-                discounted_prices.append(discounted_price_amount)
-                discount_percentages.append(discount_percentage)
-                image_urls.append(', '.join([img.get('src') for img in soup.find(
-                    'div', class_="product-gallery-control").find_all('img')]))
+                variants = [None]
+                prices = [price]
+                discounted_prices = [discounted_price]
+                discount_percentages = [discount_percentage]
+
+            image_urls = [image_url] * len(variants)
 
             # Compile the data acquired into dataframe
             df = pd.DataFrame(
@@ -241,27 +274,8 @@ class PetPlanetETL(PetProductsETL):
 
                 return df
 
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
-
-        for i, row in df_urls.iterrows():
-
-            pkey = row["id"]
-            url = row["url"]
-
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = self.extract_from_url("GET", url, verify=False)
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
-
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
+    async def fetch_product(self, url: str) -> BeautifulSoup:
+        return await asyncio.to_thread(self.extract_from_url, "GET", url, verify=False)
 
     def image_scrape_product(self, url):
         soup = self.extract_from_url("GET", url,  verify=False)
@@ -1,13 +1,12 @@
 import json
 import pandas as pd
-import undetected_chromedriver as uc
 from datetime import datetime
 from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
-from selenium.webdriver.common.by import By
 
 from ._pet_products_etl import PetProductsETL
+from .fingerprint import hash_fragments
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 
 
@@ -20,11 +19,21 @@ class PetsAtHomeETL(PetProductsETL):
         self.CATEGORIES = ["dog", "cat", "small-animal",
                            "fish", "reptile", "bird-and-wildlife"]
 
+    def get_product_data(self, soup: BeautifulSoup) -> dict:
+        return json.loads(soup.select_one("[id='__NEXT_DATA__']").text)
+
+    def fingerprint(self, soup: BeautifulSoup) -> str:
+        # __NEXT_DATA__ also carries build ids and page chrome, so only the fields used below are hashed
+        page_props = self.get_product_data(soup)["props"]["pageProps"]
+        base_product = page_props["baseProduct"]
+        variants = [(variant["label"], variant["price"]["base"], variant["price"]["promotionBase"], variant["imageUrls"])
+                    for variant in base_product["products"]]
+        return hash_fragments(base_product["name"], base_product["description"], page_props["productRating"], variants)
+
     def transform(self, soup: BeautifulSoup, url: str):
         try:
             # Get the data from encoded JSON
-            product_data = soup.select_one("[id='__NEXT_DATA__']")
-            product_data_dict = json.loads(product_data.text)
+            product_data_dict = self.get_product_data(soup)
 
             # Get base details
             product_title = product_data_dict["props"]["pageProps"]["baseProduct"]["name"]
@@ -118,28 +127,6 @@ class PetsAtHomeETL(PetProductsETL):
 
         return df
 
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
-
-        for i, row in df_urls.iterrows():
-
-            pkey = row["id"]
-            url = row["url"]
-
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = self.extract_from_url("GET", url)
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
-
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
-
     def image_scrape_product(self, url):
         soup = self.extract_from_url("GET", url)
 
@@ -1,23 +1,17 @@
 import re
 import json
-import requests
 import math
-import random
 import pandas as pd
 from datetime import datetime as dt
 from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .fetchers import BROWSER, HTTP
+from .feefo import get_feefo_client
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 from fake_useragent import UserAgent
 
-
-import asyncio
-import nest_asyncio
-from playwright.async_api import async_playwright
-nest_asyncio.apply()
-
 headers = {
     "User-Agent": UserAgent().random
 }
@@ -26,6 +20,8 @@ MAX_RETRIES = 10
 MAX_WAIT_BETWEEN_REQ = 1
 MIN_WAIT_BETWEEN_REQ = 0
 REQUEST_TIMEOUT = 30
+FEEFO_MERCHANT = "pets-corner"
+FEEFO_ORIGIN = "www.petscorner.co.uk"
 
 
 class PetsCornerETL(PetProductsETL):
@@ -34,6 +30,11 @@ class PetsCornerETL(PetProductsETL):
         super().__init__()
         self.SHOP = "PetsCorner"
         self.BASE_URL = "https://www.petscorner.co.uk"
+        self.FEEFO_MERCHANT = FEEFO_MERCHANT
+        self.FEEFO_ORIGIN = FEEFO_ORIGIN
+        self.FETCH_TIERS = [HTTP, BROWSER]
+        self.PRODUCT_SELECTOR = 'h1.product-name'
+        self.pace(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
         self.CATEGORIES = [
             '/dog/puppy-essentials/puppy-food/',
             '/dog/puppy-essentials/puppy-feeding-equipment/',
@@ -108,23 +109,15 @@ class PetsCornerETL(PetProductsETL):
         ]
 
     async def extract_scrape_content(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    user_agent=UserAgent().random,
-                    locale="en-US"
-                )
-
-                page = await context.new_page()
-
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
+
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                locale="en-US"
+            ) as page:
                 await page.set_extra_http_headers({
                     "User-Agent": UserAgent().random,
                     "Accept-Language": "en-US,en;q=0.9",
@@ -132,34 +125,24 @@ class PetsCornerETL(PetProductsETL):
                     "Referer": url,
                 })
 
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
                 await page.wait_for_selector(selector, timeout=30000)
 
-                for _ in range(random.randint(3, 6)):
-                    await page.mouse.wheel(0, random.randint(300, 700))
-                    await asyncio.sleep(random.uniform(0.5, 1))
-
-                for _ in range(random.randint(5, 10)):
-                    await page.mouse.move(random.randint(0, 800), random.randint(0, 600))
-                    await asyncio.sleep(random.uniform(0.5, 1))
+                await self.humanize(page)
 
                 rendered_html = await page.content()
+                self.write_cache("GET", url, rendered_html.encode())
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 soup = BeautifulSoup(rendered_html, "html.parser")
                 return soup
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
-
     def get_links(self, category: str) -> pd.DataFrame:
         if category not in self.CATEGORIES:
             raise ValueError(
@@ -196,18 +179,11 @@ class PetsCornerETL(PetProductsETL):
             product_rating = '0/5'
             product_id = soup.find_all(
                 'div', class_="notify-stock")[-1].get('data-productid')
-            sku = None
-            sku_tag = soup.find('div', id="feefo-product-review-widgetId")
-            if sku_tag.get('data-parent-product-sku'):
-                sku = f"parent_product_sku={sku_tag.get('data-parent-product-sku')}"
-            else:
-                sku = f"product_sku={sku_tag.get('data-product-sku')}"
-
-            rating_wrapper = requests.get(
-                f"https://api.feefo.com/api/10/importedreviews/summary/product?since_period=ALL&{sku}&merchant_identifier=pets-corner&origin=www.petscorner.co.uk")
-            if rating_wrapper.status_code == 200:
-                product_rating = str(rating_wrapper.json()[
-                                     'rating']['rating']) + '/5'
+            sku_param, sku = self.get_rating_sku(soup)
+            rating = get_feefo_client().summary_rating(
+                FEEFO_MERCHANT, FEEFO_ORIGIN, sku, sku_param, imported=True)
+            if rating is not None:
+                product_rating = str(rating) + '/5'
 
             variants = []
             prices = []
@@ -275,31 +251,24 @@ class PetsCornerETL(PetProductsETL):
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
 
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
+    def get_rating_sku(self, soup: BeautifulSoup) -> tuple:
+        sku_tag = soup.find('div', id="feefo-product-review-widgetId")
+        if sku_tag.get('data-parent-product-sku'):
+            return "parent_product_sku", sku_tag.get('data-parent-product-sku')
 
-        for i, row in df_urls.iterrows():
+        return "product_sku", sku_tag.get('data-product-sku')
 
-            pkey = row["id"]
-            url = row["url"]
+    async def feefo_lookup(self, soup: BeautifulSoup):
+        # The last tier's page is returned even when it is not a product page
+        if soup.select_one(self.PRODUCT_SELECTOR) is None:
+            return
 
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = asyncio.run(self.extract_scrape_content(
-                url, '#ctl00_Content_zneContent6_ctl05_ctl02'))
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
+        sku_param, sku = self.get_rating_sku(soup)
+        await get_feefo_client().prefetch_summary(FEEFO_MERCHANT, FEEFO_ORIGIN, sku, sku_param, imported=True)
 
-    def image_scrape_product(self, url):
-        soup = asyncio.run(self.extract_scrape_content(
-            url, '#ctl00_Content_zneContent6_ctl05_ctl02'))
+    async def image_scrape_product_async(self, url):
+        soup = await self.extract_scrape_content(
+            url, '#ctl00_Content_zneContent6_ctl05_ctl02')
 
         return {
             'shop': self.SHOP,
@@ -1,4 +1,3 @@
-import requests
 import math
 import pandas as pd
 from datetime import datetime
@@ -102,7 +101,8 @@ class PetShopETL(PetProductsETL):
             image_urls.append(', '.join([img.find('img').get(
                 'src') for img in soup.find('ul', class_="bxslider").find_all('li')]))
 
-            get_price_details = requests.get(
+            get_price_details = self.request(
+                "GET",
                 f"https://www.petshop.co.uk/api/cacheable/items?c=3934951&country=GB&currency=GBP&fieldset=details&include=facets&language=en&n=2&pricelevel=5&url={product_url.replace('/', '')}&use_pcv=T")
             if get_price_details.status_code == 200:
                 product_info = get_price_details.json()['items'][0]
@@ -1,4 +1,3 @@
-import requests
 import json
 import math
 import pandas as pd
@@ -115,7 +114,7 @@ class PetShopOnlineETL(PetProductsETL):
                 'Accept': 'application/json'
             }
 
-            product_info = requests.get(url, headers=headers)
+            product_info = self.request("GET", url, headers=headers)
 
             for variant_info in product_info.json()['product']["variants"]:
                 variants.append(variant_info.get('title'))
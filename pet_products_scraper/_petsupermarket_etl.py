@@ -1,5 +1,4 @@
 import json
-import random
 import requests
 import pandas as pd
 from datetime import datetime as dt
@@ -7,6 +6,7 @@ from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .fetchers import BROWSER, HTTP
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 from tenacity import (
     before_sleep_log,
@@ -18,11 +18,6 @@ from tenacity import (
 
 from fake_useragent import UserAgent
 
-import asyncio
-import nest_asyncio
-from playwright.async_api import async_playwright
-nest_asyncio.apply()
-
 MAX_RETRIES = 25
 MAX_WAIT_BETWEEN_REQ = 1
 MIN_WAIT_BETWEEN_REQ = 0.5
@@ -35,6 +30,9 @@ class PetSupermarketETL(PetProductsETL):
         super().__init__()
         self.SHOP = "PetSupermarket"
         self.BASE_URL = "https://www.pet-supermarket.co.uk"
+        self.FETCH_TIERS = [HTTP, BROWSER]
+        self.PRODUCT_SELECTOR = "div[class*='product-header'] h1[class*='name']"
+        self.pace(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
         self.CATEGORIES = ["/Dog/c/c000001", "/Cat/c/c000002",
                            "/Small-Animals/c/c008034", "/Birds/c/c008002"]
 
@@ -46,22 +44,15 @@ class PetSupermarketETL(PetProductsETL):
         reraise=True,
     )
     async def extract_scrape_content(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    user_agent=UserAgent().random,
-                    locale="en-US"
-                )
-
-                page = await context.new_page()
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
+
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                locale="en-US"
+            ) as page:
                 await page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
                 await page.set_extra_http_headers({
@@ -72,35 +63,24 @@ class PetSupermarketETL(PetProductsETL):
                     "Referer": url,
                 })
 
-                await asyncio.sleep(random.uniform(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ))
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
                 await page.wait_for_selector(selector, timeout=30000)
 
-                for _ in range(random.randint(3, 6)):
-                    await page.mouse.wheel(0, random.randint(300, 700))
-                    await asyncio.sleep(random.uniform(0.5, 1))
-
-                for _ in range(random.randint(5, 10)):
-                    await page.mouse.move(random.randint(0, 800), random.randint(0, 600))
-                    await asyncio.sleep(random.uniform(0.5, 1))
+                await self.humanize(page)
 
                 rendered_html = await page.content()
+                self.write_cache("GET", url, rendered_html.encode())
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 soup = BeautifulSoup(rendered_html, "html.parser")
                 return soup
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
-
     def transform(self, soup: BeautifulSoup, url: str):
         try:
             product_header = soup.select_one(
@@ -211,31 +191,8 @@ class PetSupermarketETL(PetProductsETL):
 
         return df
 
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
-
-        for i, row in df_urls.iterrows():
-
-            pkey = row["id"]
-            url = row["url"]
-
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = asyncio.run(
-                self.extract_scrape_content(url, '#feedbackButton'))
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
-
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
-
-    def image_scrape_product(self, url):
-        soup = asyncio.run(self.extract_scrape_content(url, '#feedbackButton'))
+    async def image_scrape_product_async(self, url):
+        soup = await self.extract_scrape_content(url, '#feedbackButton')
 
         return {
             'shop': self.SHOP,
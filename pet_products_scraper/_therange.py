@@ -1,8 +1,6 @@
 import requests
 import re
 import json
-import random
-import cloudscraper
 import pandas as pd
 
 from datetime import datetime as dt
@@ -10,6 +8,7 @@ from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .fetchers import BROWSER, HTTP
 from fake_useragent import UserAgent
 from tenacity import (
     before_sleep_log,
@@ -23,9 +22,6 @@ from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 from fake_useragent import UserAgent
 
 import asyncio
-import nest_asyncio
-from playwright.async_api import async_playwright
-nest_asyncio.apply()
 
 MAX_RETRIES = 10
 MAX_WAIT_BETWEEN_REQ = 5
@@ -39,6 +35,9 @@ class TheRangeETL(PetProductsETL):
         super().__init__()
         self.SHOP = "TheRange"
         self.BASE_URL = "https://www.therange.co.uk"
+        self.FETCH_TIERS = [HTTP, BROWSER]
+        self.PRODUCT_SELECTOR = '#variant_container'
+        self.pace(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
         self.CATEGORIES = [
             "/offers/category/pets/",
             "/pets/dogs/",
@@ -80,6 +79,11 @@ class TheRangeETL(PetProductsETL):
             "/pets/pet-brands/",
             "/best-sellers/pets/"
         ]
+        self.HANDOFF_URL = self.BASE_URL
+        self.HANDOFF_CONTEXT = {
+            "user_agent": UserAgent().random, "locale": "en-US"}
+        # Variant JSON and review soup of each fetched product page, by url
+        self.prefetched = {}
 
     @retry(
         wait=wait_random(min=MIN_WAIT_BETWEEN_REQ, max=MAX_WAIT_BETWEEN_REQ),
@@ -89,22 +93,15 @@ class TheRangeETL(PetProductsETL):
         reraise=True,
     )
     async def extract_scrape_content(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    user_agent=UserAgent().random,
-                    locale="en-US"
-                )
-
-                page = await context.new_page()
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
+
+            async with self.browser_page(
+                user_agent=UserAgent().random,
+                locale="en-US"
+            ) as page:
                 await page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
                 await page.set_extra_http_headers({
@@ -127,34 +124,24 @@ class TheRangeETL(PetProductsETL):
                     "Sec-Fetch-User": "?1"
                 })
 
-                await asyncio.sleep(random.uniform(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ))
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
                 await page.wait_for_selector(selector, timeout=30000)
 
-                for _ in range(random.randint(3, 6)):
-                    await page.mouse.wheel(0, random.randint(300, 700))
-                    await asyncio.sleep(random.uniform(0.5, 1))
-
-                for _ in range(random.randint(5, 10)):
-                    await page.mouse.move(random.randint(0, 800), random.randint(0, 600))
-                    await asyncio.sleep(random.uniform(0.5, 1))
+                await self.humanize(page)
 
                 rendered_html = await page.content()
+                self.write_cache("GET", url, rendered_html.encode())
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 soup = BeautifulSoup(rendered_html, "html.parser")
                 return soup
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
 
     @retry(
         wait=wait_random(min=MIN_WAIT_BETWEEN_REQ, max=MAX_WAIT_BETWEEN_REQ),
@@ -164,18 +151,30 @@ class TheRangeETL(PetProductsETL):
         reraise=True,
     )
     async def get_json_product(self, url):
-        browser = None
-        try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
+        response = await self.fetch_http(url)
+        if response is not None:
+            try:
+                return response.json()
+
+            except ValueError:
+                logger.warning(f"No JSON at {url}, using the browser")
 
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(locale="en-US")
+        return await self.get_json_product_from_browser(url)
 
-                page = await context.new_page()
+    @retry(
+        wait=wait_random(min=MIN_WAIT_BETWEEN_REQ, max=MAX_WAIT_BETWEEN_REQ),
+        stop=stop_after_attempt(MAX_RETRIES),
+        retry=retry_if_exception_type(requests.RequestException),
+        before_sleep=before_sleep_log(logger, "WARNING"),
+        reraise=True,
+    )
+    async def get_json_product_from_browser(self, url):
+        try:
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return json.loads(cached)
+
+            async with self.browser_page(locale="en-US") as page:
                 await page.set_extra_http_headers({
                     "User-Agent": UserAgent().random,
                     "Accept": 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -195,28 +194,22 @@ class TheRangeETL(PetProductsETL):
                     "Sec-Fetch-User": "?1"
                 })
 
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
 
                 output = await page.content()
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 soup = BeautifulSoup(output, 'html.parser')
                 pre_tag = soup.find('pre')
 
                 if pre_tag:
                     json_text = pre_tag.get_text()
+                    self.write_cache("GET", url, json_text.encode())
                     output = json.loads(json_text)
                     logger.info(f"Successfully extracted JSON data from {url}")
-
-                    # Sleep between requests
-                    sleep_time = random.uniform(
-                        MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-                    logger.info(f"Sleeping for {sleep_time} seconds...")
-
                     return output
                 else:
                     logger.error(f"No <pre> tag found at {url}")
@@ -225,27 +218,38 @@ class TheRangeETL(PetProductsETL):
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
+    async def get_rating_soup(self, soup: BeautifulSoup, clean_url: str) -> BeautifulSoup:
+        if soup.find('div', class_="no_reviews_info"):
+            return None
+
+        product_id = soup.find('input', id="product_id").get('value')
+        url = f'{clean_url}?action=loadreviews&pid={product_id}&page=1'
+        # Escalating a review fragment says nothing about the tier product pages need
+        return await self.fetch_escalating(url, '#review-product-summary', remember=False)
+
+    async def fetch_product_extras(self, soup: BeautifulSoup, clean_url: str) -> tuple:
+        # The variant JSON and the reviews are fetched side by side
+        return await asyncio.gather(self.get_json_product(f'{clean_url}?json'), self.get_rating_soup(soup, clean_url))
 
     def transform(self, soup: BeautifulSoup, url: str) -> pd.DataFrame:
+        # Taken before anything can fail, so that no entry outlives its product
+        extras = self.prefetched.pop(url.split('#')[0], None)
+        if extras is None:
+            logger.error(
+                f"Error scraping {url}: its variant JSON and reviews were not fetched")
+            return None
+
         try:
             product_name = soup.find('h1', id="product-dyn-title").get_text()
             product_description = soup.find(
                 'p', id='product-dyn-desc').find(string=True)
             product_url = url.replace(self.BASE_URL, "")
             product_rating = "0/5"
-            product_id = soup.find('input', id="product_id").get('value')
-            clean_url = url.split('#')[0]
-
-            if not soup.find('div', class_="no_reviews_info"):
-                product_rating_soup = asyncio.run(self.extract_scrape_content(
-                    f'{clean_url}?action=loadreviews&pid={product_id}&page=1', '#review-product-summary'))
+            product_details, product_rating_soup = extras
 
-                if product_rating_soup.find('div', id="review-product-summary"):
-                    product_rating = str(round((int(product_rating_soup.find('div', id="review-product-summary").findAll(
-                        'div', class_="progress-bar")[0].get('aria-valuenow')) / 100) * 5, 2)) + '/5'
+            if product_rating_soup and product_rating_soup.find('div', id="review-product-summary"):
+                product_rating = str(round((int(product_rating_soup.find('div', id="review-product-summary").findAll(
+                    'div', class_="progress-bar")[0].get('aria-valuenow')) / 100) * 5, 2)) + '/5'
 
             variants = []
             prices = []
@@ -253,8 +257,6 @@ class TheRangeETL(PetProductsETL):
             discount_percentages = []
             image_urls = []
 
-            product_details = asyncio.run(
-                self.get_json_product(f'{clean_url}?json'))
             if len(product_details['variant_arr']) > 1:
                 for var_details in product_details['variant_arr']:
                     if " - " in var_details['name']:
@@ -309,7 +311,7 @@ class TheRangeETL(PetProductsETL):
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
 
-    def get_links(self, category: str) -> pd.DataFrame:
+    async def get_links_async(self, category: str) -> pd.DataFrame:
         if category not in self.CATEGORIES:
             raise ValueError(
                 f"Invalid category. Value must be in {self.CATEGORIES}")
@@ -317,14 +319,14 @@ class TheRangeETL(PetProductsETL):
         try:
             category_link = f"{self.BASE_URL}{category}"
             urls = []
-            soup = asyncio.run(
-                self.extract_scrape_content(category_link,  '#root'))
+            soup = await self.extract_scrape_content(category_link,  '#root')
 
             category_id = soup.find('div', id="root")['data-page-id']
             total_product = soup.find('div', id="root")['data-total-results']
 
-            product_list = self.session.request(method="GET",
-                                                url=f'https://search.therange.co.uk/api/productlist?categoryId={category_id}&sort=relevance&limit={total_product}&filters=%7B"in_stock_f"%3A%5B"true"%5D%7D', timeout=REQUEST_TIMEOUT)
+            # Categories are crawled side by side, so the throttled request runs off the loop
+            product_list = await asyncio.to_thread(self.request, "GET",
+                                                   f'https://search.therange.co.uk/api/productlist?categoryId={category_id}&sort=relevance&limit={total_product}&filters=%7B"in_stock_f"%3A%5B"true"%5D%7D', timeout=REQUEST_TIMEOUT)
             product_list.raise_for_status()
             if product_list.status_code == 200:
                 for url in product_list.json()['products']:
@@ -341,43 +343,19 @@ class TheRangeETL(PetProductsETL):
                 f"Could not extract category details from {category_link}")
             return None
 
-    def refresh_links(self, db_conn: Engine, table_name: str):
-        execute_query(db_conn, f"TRUNCATE TABLE {table_name};")
-
-        for category in self.CATEGORIES:
-            df = self.get_links(category)
-            if df is not None:
-                self.load(df, db_conn, table_name)
-
-        sql = get_sql_from_file("insert_into_urls.sql")
-        execute_query(db_conn, sql)
-
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
-
-        for i, row in df_urls.iterrows():
-
-            pkey = row["id"]
-            url = row["url"]
-
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = asyncio.run(self.extract_scrape_content(
-                url,  '#variant_container'))
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
+    async def fetch_product(self, url: str) -> BeautifulSoup:
+        soup = await super().fetch_product(url)
+        # A 304 has no page to fetch the extras of
+        if soup is not None and soup.find(id="variant_container") is not None:
+            # Without a fingerprint every page with a body goes on to transform
+            clean_url = url.split('#')[0]
+            self.prefetched[clean_url] = await self.fetch_product_extras(soup, clean_url)
 
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
+        return soup
 
-    def image_scrape_product(self, url):
-        soup = asyncio.run(self.extract_scrape_content(
-            url, '#variant_container'))
+    async def image_scrape_product_async(self, url):
+        soup = await self.extract_scrape_content(
+            url, '#variant_container')
 
         return {
             'shop': self.SHOP,
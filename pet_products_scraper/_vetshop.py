@@ -1,4 +1,3 @@
-import requests
 import math
 import pandas as pd
 from datetime import datetime
@@ -115,7 +114,8 @@ class VetShopETL(PetProductsETL):
                     price = float(soup.find_all(
                         'p', class_="item-views-blb-price-option-price")[1].get_text().replace('£', ''))
                 else:
-                    get_price_details = requests.get(
+                    get_price_details = self.request(
+                        "GET",
                         f"https://www.vetshop.co.uk/api/items?c=3934951&country=GB&currency=GBP&fields=pricelevel4%2Cpricelevel4_formatted&fieldset=details&include=facets&language=en&n=3&pricelevel=4&url={product_url.replace('/', '')}")
                     if get_price_details.status_code == 200:
                         product_info = get_price_details.json()['items'][0]
@@ -156,8 +156,10 @@ class VetUKETL(PetProductsETL):
         except Exception as e:
             logger.error(f"Error scraping {url}: {e}")
 
-    def refresh_links(self, db_conn: Engine, table_name: str):
-        execute_query(db_conn, f"TRUNCATE TABLE {table_name};")
+    def get_categories(self) -> list:
+        if self.CATEGORIES:
+            return self.CATEGORIES
+
         logger.info("Gathering the categories links ..")
         soup = self.extract_from_url('get', self.BASE_URL)
         url_links_query = [
@@ -179,14 +181,7 @@ class VetUKETL(PetProductsETL):
                 self.CATEGORIES.append(url.find('a').get('href'))
 
         logger.info("Finished gathering category links...")
-
-        for category in self.CATEGORIES:
-            df = self.get_links(category)
-            if df is not None:
-                self.load(df, db_conn, table_name)
-
-        sql = get_sql_from_file("insert_into_urls.sql")
-        execute_query(db_conn, sql)
+        return self.CATEGORIES
 
     def image_scrape_product(self, url):
         soup = self.extract_from_url("GET", url)
@@ -1,21 +1,13 @@
 import pandas as pd
-import cloudscraper
 import random
-import requests
 import math
 from datetime import datetime as dt
 from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .fetchers import CLOUDSCRAPER, HTTP
 from loguru import logger
-from tenacity import (
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_random,
-)
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 
 
@@ -67,46 +59,18 @@ class ViovetETL(PetProductsETL):
         super().__init__()
         self.SHOP = "Viovet"
         self.BASE_URL = "https://www.viovet.co.uk"
+        self.FETCH_TIERS = [HTTP, CLOUDSCRAPER]
+        self.PRODUCT_SELECTOR = 'h1#product_family_heading'
+        self.pace(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
         self.CATEGORIES = CATEGORIES
 
     def setup_cloudscraper(self):
-        scraper = cloudscraper.create_scraper(browser='chrome')
+        scraper = super().setup_cloudscraper()
         random_user_agent = random.choice(USER_AGENTS)
         scraper.headers.update({"User-Agent": random_user_agent})
         scraper.headers.update({"Referer": "https://www.google.com"})
         return scraper
 
-    @retry(
-        wait=wait_random(min=MIN_WAIT_BETWEEN_REQ, max=MAX_WAIT_BETWEEN_REQ),
-        stop=stop_after_attempt(MAX_RETRIES),
-        retry=retry_if_exception_type(requests.RequestException),
-        before_sleep=before_sleep_log(logger, "WARNING"),
-        reraise=True,
-    )
-    def fetch_page(self, url: str) -> BeautifulSoup:
-        try:
-            logger.info(f"[INFO] Fetching: {url}")
-            response = self.setup_cloudscraper().get(
-                url, timeout=REQUEST_TIMEOUT)
-
-            # ✅ Check Cloudflare Response
-            if response.status_code == 403:
-                logger.warning(
-                    f"[WARNING] Cloudflare blocked the request! Retrying...")
-                raise requests.RequestException(
-                    "Cloudflare protection triggered.")
-
-            response.raise_for_status()
-
-            logger.info(
-                f"Successfully extracted data from {url} {response.status_code}"
-            )
-            return BeautifulSoup(response.content, "html.parser")
-
-        except requests.RequestException as e:
-            logger.error(f"[ERROR] Failed to fetch {url}: {e}")
-            # raise
-
     def transform(self, soup: BeautifulSoup, url: str):
         try:
             product_name = soup.select_one(
@@ -177,14 +141,14 @@ class ViovetETL(PetProductsETL):
         current_url = f"{self.BASE_URL}{category}"
         urls = []
 
-        soup = self.fetch_page(current_url)
+        soup = self.extract_from_cloudscraper(current_url)
 
         pagination_length = 0
         product_number = int(soup.select_one('div[class*="products-area"]').find_all('div')[0].find_all(
             'span')[3].find('span').get_text().replace('Sort all ', '').replace(' product ranges by:', ''))
         if (product_number <= 36):
             page_url = f"{current_url}?page=1"
-            page_pagination_source = self.fetch_page(page_url)
+            page_pagination_source = self.extract_from_cloudscraper(page_url)
             product_list = page_pagination_source.select(
                 'a[class*="ab_var_one grid-box _one-whole _no-padding _no-margin"][itemprop="url"]')
 
@@ -197,7 +161,7 @@ class ViovetETL(PetProductsETL):
             pagination_length = math.ceil(product_number / 36)
             for i in range(1, pagination_length + 1):
                 page_url = f"{current_url}?page={i}"
-                page_pagination_source = self.fetch_page(page_url)
+                page_pagination_source = self.extract_from_cloudscraper(page_url)
                 product_list = page_pagination_source.select(
                     'a[class*="ab_var_one grid-box _one-whole _no-padding _no-margin"][itemprop="url"]')
 
@@ -210,41 +174,8 @@ class ViovetETL(PetProductsETL):
         df.insert(0, "shop", self.SHOP)
         return df
 
-    def run(self, db_conn: Engine, table_name: str):
-        sql = get_sql_from_file("select_unscraped_urls.sql")
-        sql = sql.format(shop=self.SHOP)
-        df_urls = self.extract_from_sql(db_conn, sql)
-
-        for i, row in df_urls.iterrows():
-
-            pkey = row["id"]
-            url = row["url"]
-
-            now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            soup = self.fetch_page(url)
-            df = self.transform(soup, url)
-
-            if df is not None:
-                self.load(df, db_conn, table_name)
-                update_url_scrape_status(db_conn, pkey, "DONE", now)
-
-            else:
-                update_url_scrape_status(db_conn, pkey, "FAILED", now)
-
-    def refresh_links(self, db_conn: Engine, table_name: str):
-        execute_query(db_conn, f"TRUNCATE TABLE {table_name};")
-
-        for category in self.CATEGORIES:
-            df = self.get_links(category)
-            if df is not None:
-                self.load(df, db_conn, table_name)
-
-        sql = get_sql_from_file("insert_into_urls.sql")
-        execute_query(db_conn, sql)
-
     def image_scrape_product(self, url):
-        soup = self.fetch_page(url)
+        soup = self.extract_from_cloudscraper(url)
 
         return {
             'shop': self.SHOP,
@@ -1,15 +1,15 @@
 import pandas as pd
-import random
 import requests
 import math
 import re
 import json
-import time
 from datetime import datetime
 from loguru import logger
 from bs4 import BeautifulSoup
 from sqlalchemy import Engine
 from ._pet_products_etl import PetProductsETL
+from .fetchers import BROWSER, HTTP
+from .fingerprint import hash_fragments
 from .utils import execute_query, update_url_scrape_status, get_sql_from_file
 from tenacity import (
     before_sleep_log,
@@ -21,11 +21,6 @@ from tenacity import (
 
 from fake_useragent import UserAgent
 
-import asyncio
-import nest_asyncio
-from playwright.async_api import async_playwright
-nest_asyncio.apply()
-
 MAX_RETRIES = 25
 MAX_WAIT_BETWEEN_REQ = 10
 MIN_WAIT_BETWEEN_REQ = 5
@@ -38,6 +33,12 @@ class ZooplusETL(PetProductsETL):
         super().__init__()
         self.SHOP = "Zooplus"
         self.BASE_URL = "https://www.zooplus.co.uk"
+        # The browser, with the headers tuned for Zooplus, is kept for pages the
+        # handed-off session is still refused on
+        self.FETCH_TIERS = [HTTP, BROWSER]
+        self.PRODUCT_SELECTOR = "div[class*='VariantList_variantList'], span[data-zta='SelectedArticleBox__TopSection']"
+        self.pace(MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ, concurrency=1)
+        self.HANDOFF_URL = self.BASE_URL
         self.CATEGORIES = [
             '/shop/dogs/dry_dog_food',
             '/shop/dogs/wet_dog_food',
@@ -107,22 +108,14 @@ class ZooplusETL(PetProductsETL):
         reraise=True,
     )
     async def extract_scrape_content(self, url, selector):
-        soup = None
-        browser = None
         try:
-            async with async_playwright() as p:
-                browser_args = {
-                    "headless": True,
-                    "args": ["--disable-blink-features=AutomationControlled"]
-                }
-
-                browser = await p.chromium.launch(**browser_args)
-                context = await browser.new_context(
-                    locale="en-US"
-                )
-
-                page = await context.new_page()
+            cached = self.read_cache("GET", url)
+            if cached is not None:
+                return BeautifulSoup(cached, "html.parser")
 
+            async with self.browser_page(
+                locale="en-US"
+            ) as page:
                 await page.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
                 await page.set_extra_http_headers({
                     "Accept": 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -142,34 +135,54 @@ class ZooplusETL(PetProductsETL):
                     "Sec-Fetch-Site": "same-origin",
                     "Sec-Fetch-User": "?1"
                 })
-                await page.goto(url, wait_until="domcontentloaded")
+                await self.throttle_async(url)
+                response = await page.goto(url, wait_until="domcontentloaded")
+                await self.raise_for_block(url, page, response)
                 await page.wait_for_selector(selector, timeout=300000)
 
-                for _ in range(random.randint(3, 6)):
-                    await page.mouse.wheel(0, random.randint(300, 700))
-                    await asyncio.sleep(random.uniform(0.5, 1))
-
-                for _ in range(random.randint(5, 10)):
-                    await page.mouse.move(random.randint(0, 800), random.randint(0, 600))
-                    await asyncio.sleep(random.uniform(0.5, 1))
+                await self.humanize(page)
 
                 rendered_html = await page.content()
+                self.write_cache("GET", url, rendered_html.encode())
                 logger.info(
                     f"Successfully extracted data from {url}"
                 )
-                sleep_time = random.uniform(
-                    MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-
-                logger.info(f"Sleeping for {sleep_time} seconds...")
                 soup = BeautifulSoup(rendered_html, "html.parser")
                 return soup
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
 
-        finally:
-            if browser:
-                await browser.close()
+    def fingerprint(self, soup: BeautifulSoup) -> str:
+        # Prices are only in the markup, so the price boxes are hashed next to the JSON-LD
+        product_data = json.loads(soup.select(
+            "script[type*='application/ld+json']")[0].text)
+
+        variants = []
+        variants_list = soup.find(
+            'div', class_="VariantList_variantList__PeaNd")
+        if variants_list:
+            for variant_hopp in variants_list.select("div[data-hopps*='Variant']"):
+                variants.append((
+                    variant_hopp.select_one(
+                        "span[class*='VariantDescription_description']").text,
+                    variant_hopp.find('img').get('src'),
+                    [tag.get_text(strip=True) for tag in variant_hopp.select(
+                        "[class*='z-product-price__']")],
+                ))
+
+        else:
+            top_section = soup.find(
+                'span', attrs={'data-zta': 'SelectedArticleBox__TopSection'})
+            variants.append((
+                soup.select_one(
+                    "div[data-zta*='ProductTitle__Subtitle']").text,
+                soup.find('meta', attrs={'property': "og:image"}).get('content'),
+                [tag.get_text(strip=True) for tag in top_section.select(
+                    "[class*='z-product-price__']")],
+            ))
+
+        return hash_fragments(product_data['name'], product_data['description'], product_data.get("aggregateRating"), variants)
 
     def transform(self, soup: BeautifulSoup, url: str):
         try:
@@ -278,17 +291,12 @@ class ZooplusETL(PetProductsETL):
     def get_product_links(self, url, headers):
         try:
             # Parse request response
-            response = self.session.request(
-                method="GET", url=url, headers=headers)
+            response = self.request("GET", url, headers=headers)
             response.raise_for_status()
 
             logger.info(
                 f"Successfully extracted data from {url} {response.status_code}"
             )
-            sleep_time = random.uniform(
-                MIN_WAIT_BETWEEN_REQ, MAX_WAIT_BETWEEN_REQ)
-            time.sleep(sleep_time)
-            logger.info(f"Sleeping for {sleep_time} seconds...")
             return response
 
         except Exception as e:
@@ -0,0 +1,100 @@
+import time
+import asyncio
+from loguru import logger
+
+BLOCK_THRESHOLD = 5
+COOLDOWN = 60
+MAX_COOLDOWN = 1800
+PROBE_POLL_INTERVAL = 1
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+
+# Stops a shop's queue after BLOCK_THRESHOLD consecutive blocked products. Once
+# the cool-down has passed a single probe is let through: success closes the
+# breaker, another block reopens it with twice the cool-down. Past MAX_COOLDOWN
+# the shop is given up on for this run.
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int = BLOCK_THRESHOLD, cooldown: float = COOLDOWN, max_cooldown: float = MAX_COOLDOWN):
+        self.name = name
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.reset()
+
+    def reset(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self.opened_at = None
+        self.gave_up = False
+
+    async def acquire(self) -> bool:
+        # Returns False once the shop has been given up on
+        while True:
+            if self.gave_up:
+                return False
+
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                remaining = self.opened_at + self.cooldown - time.monotonic()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+                    continue
+
+                self.state = HALF_OPEN
+                logger.info(f"Probing {self.name} after {self.cooldown:.0f}s cool-down")
+                return True
+
+            # Another worker holds the probe
+            await asyncio.sleep(PROBE_POLL_INTERVAL)
+
+    def record(self, blocked: bool):
+        if self.state == HALF_OPEN:
+            if blocked:
+                self._open(self.cooldown * 2)
+            else:
+                logger.info(f"Closed circuit breaker for {self.name}")
+                self.state = CLOSED
+                self.failures = 0
+                self.cooldown = self.base_cooldown
+            return
+
+        if self.state == OPEN:
+            # Late results of products that were in flight when the breaker opened
+            return
+
+        if not blocked:
+            self.failures = 0
+            return
+
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self._open(self.base_cooldown)
+
+    def _open(self, cooldown: float):
+        if cooldown > self.max_cooldown:
+            logger.error(
+                f"{self.name} is still blocked after backing off; giving up for this run")
+            self.gave_up = True
+            return
+
+        logger.warning(
+            f"Opened circuit breaker for {self.name}, cooling down for {cooldown:.0f}s")
+        self.state = OPEN
+        self.cooldown = cooldown
+        self.opened_at = time.monotonic()
+
+
+_breakers = {}
+
+
+def get_circuit_breaker(shop: str) -> CircuitBreaker:
+    if shop not in _breakers:
+        _breakers[shop] = CircuitBreaker(shop)
+
+    return _breakers[shop]
@@ -0,0 +1,279 @@
+import asyncio
+import multiprocessing
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+from loguru import logger
+
+POOL_SIZE = 2
+MAX_PAGES_PER_CONTEXT = 50
+BROWSER_ARGS = {
+    "headless": True,
+    "args": ["--disable-blink-features=AutomationControlled"]
+}
+# Parsers only read the HTML and a few JSON payloads
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "bat.bing.com",
+    "criteo.com",
+    "criteo.net",
+    "tiktok.com",
+    "pinimg.com",
+    "quantserve.com",
+    "scorecardresearch.com",
+)
+
+
+# Aborts page requests by resource type and by domain. Shops whose selectors need
+# one of the blocked resources pass their own policy, or None to load everything.
+class ResourceBlocking:
+    def __init__(self, resource_types=BLOCKED_RESOURCE_TYPES, domains=BLOCKED_DOMAINS):
+        self.resource_types = frozenset(resource_types)
+        self.domains = tuple(domains)
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.resource_types:
+            return True
+
+        host = urlparse(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.domains)
+
+    async def route(self, route):
+        request = route.request
+        if self.blocks(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+
+# Browsers allowed across all the worker processes of a multi-shop run. A pool takes
+# all of its browsers at once so that two half-started pools cannot starve each other.
+class BrowserBudget:
+    def __init__(self, total: int, context=multiprocessing):
+        self.total = total
+        self._available = context.Value("i", total, lock=False)
+        self._condition = context.Condition()
+
+    def acquire(self, n: int) -> int:
+        n = max(1, min(n, self.total))
+        with self._condition:
+            self._condition.wait_for(lambda: self._available.value >= n)
+            self._available.value -= n
+
+        return n
+
+    def release(self, n: int):
+        with self._condition:
+            self._available.value += n
+            self._condition.notify_all()
+
+
+class BrowserSlot:
+    def __init__(self):
+        self.browser = None
+        self.context = None
+        self.pages_served = 0
+
+
+# Keeps warm browsers with one context each and hands out fresh pages. A context is
+# recycled after max_pages_per_context pages or a crash. Context options only apply
+# when a context is (re)created.
+class BrowserPool:
+    def __init__(self, size: int = POOL_SIZE, max_pages_per_context: int = MAX_PAGES_PER_CONTEXT):
+        self.size = size
+        self.max_pages_per_context = max_pages_per_context
+        self._playwright = None
+        self._slots = None
+        self._loop = None
+        self._starting = None
+        self.budget = None
+        self._reserved = 0
+
+    async def start(self):
+        # Imported here so that shops without a browser never load playwright
+        from playwright.async_api import async_playwright
+
+        if self.budget is not None:
+            self.size = await asyncio.to_thread(self.budget.acquire, self.size)
+            self._reserved = self.size
+
+        try:
+            self._playwright = await async_playwright().start()
+        except Exception:
+            self._release_budget()
+            raise
+        self._slots = asyncio.Queue()
+        for _ in range(self.size):
+            self._slots.put_nowait(BrowserSlot())
+
+        logger.info(f"Started browser pool with {self.size} browsers")
+
+    async def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Playwright handles are bound to the loop that created them
+            self._playwright = None
+            self._starting = None
+            self._release_budget()
+            self._loop = loop
+
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self.start())
+
+        await self._starting
+
+    async def _open_context(self, slot: BrowserSlot, context_options: dict):
+        if slot.browser is None or not slot.browser.is_connected():
+            slot.browser = await self._playwright.chromium.launch(**BROWSER_ARGS)
+
+        if slot.context is None:
+            slot.context = await slot.browser.new_context(**context_options)
+            slot.pages_served = 0
+
+        return slot.context
+
+    async def _recycle(self, slot: BrowserSlot):
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception as e:
+                logger.warning(f"Could not close browser context: {e}")
+
+        slot.context = None
+        slot.pages_served = 0
+
+    @asynccontextmanager
+    async def page(self, blocking: ResourceBlocking = None, **context_options):
+        await self._ensure_started()
+        slot = await self._slots.get()
+        page = None
+        try:
+            context = await self._open_context(slot, context_options)
+            page = await context.new_page()
+            if blocking is not None:
+                await page.route("**/*", blocking.route)
+
+            yield page
+
+        except Exception:
+            # Do not hand a possibly broken context to the next caller
+            await self._recycle(slot)
+            raise
+
+        finally:
+            if page is not None and slot.context is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    await self._recycle(slot)
+
+            slot.pages_served += 1
+            if slot.pages_served >= self.max_pages_per_context:
+                await self._recycle(slot)
+
+            self._slots.put_nowait(slot)
+
+    async def close(self):
+        if self._playwright is None or self._loop is not asyncio.get_running_loop():
+            self._playwright = None
+            self._starting = None
+            self._release_budget()
+            return
+
+        while not self._slots.empty():
+            slot = self._slots.get_nowait()
+            await self._recycle(slot)
+            if slot.browser is not None:
+                try:
+                    await slot.browser.close()
+                except Exception as e:
+                    logger.warning(f"Could not close browser: {e}")
+
+        await self._playwright.stop()
+        self._playwright = None
+        self._starting = None
+        self._release_budget()
+        logger.info("Closed browser pool")
+
+    def _release_budget(self):
+        if self._reserved:
+            self.budget.release(self._reserved)
+            self._reserved = 0
+
+
+# JSON bodies of the page's network responses whose url matches, so that listings
+# loaded over XHR are read from the API payloads instead of the rendered DOM.
+class ResponseCapture:
+    def __init__(self, matches):
+        self.matches = matches
+        self.bodies = []
+        self._tasks = []
+        self._arrived = asyncio.Event()
+
+    def on_response(self, response):
+        if self.matches(response.url):
+            self._tasks.append(asyncio.ensure_future(self._read(response)))
+
+    async def _read(self, response):
+        try:
+            self.bodies.append(await response.json())
+            self._arrived.set()
+
+        except Exception as e:
+            logger.warning(f"Could not read a captured response from {response.url}: {e}")
+
+    async def wait(self, seen: int, timeout: float) -> bool:
+        # Waits until there are more than `seen` bodies; False once the timeout passes
+        while len(self.bodies) <= seen:
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout)
+            except asyncio.TimeoutError:
+                return len(self.bodies) > seen
+
+        return True
+
+    async def drain(self):
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+@asynccontextmanager
+async def capture_responses(page, matches):
+    capture = ResponseCapture(matches)
+    page.on("response", capture.on_response)
+    try:
+        yield capture
+
+    finally:
+        page.remove_listener("response", capture.on_response)
+        await capture.drain()
+
+
+_pool = None
+
+
+def get_browser_pool() -> BrowserPool:
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+
+    return _pool
+
+
+def configure_browser_pool(size: int = POOL_SIZE, max_pages_per_context: int = MAX_PAGES_PER_CONTEXT, budget: BrowserBudget = None):
+    pool = get_browser_pool()
+    pool.size = size
+    pool.max_pages_per_context = max_pages_per_context
+    pool.budget = budget
+
+
+async def close_browser_pool():
+    if _pool is not None:
+        await _pool.close()
@@ -0,0 +1,95 @@
+import os
+import json
+import hashlib
+import tempfile
+import requests
+from loguru import logger
+
+CACHE_DIR = "cache"
+COMPRESSION_LEVEL = 3
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CacheMiss(Exception):
+    pass
+
+
+# Raw responses stored as zstd files addressed by a hash of method + URL + body,
+# so that parsers can be re-run on a whole shop without touching the network.
+class ResponseCache:
+    def __init__(self, root: str = CACHE_DIR, mode: str = RECORD):
+        # Only runs that record or replay need zstandard
+        import zstandard
+
+        self.root = root
+        self.mode = mode
+        # zstd (de)compressors are not thread-safe, so one is made per call
+        self._zstd = zstandard
+
+    @property
+    def record(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == REPLAY
+
+    def key(self, method: str, url: str, body=None) -> str:
+        raw = f"{method.upper()} {url}"
+        if body:
+            raw += " " + json.dumps(body, sort_keys=True, default=str)
+
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.zst")
+
+    def contains(self, method: str, url: str, body=None) -> bool:
+        return os.path.exists(self.path(self.key(method, url, body)))
+
+    def get(self, method: str, url: str, body=None) -> bytes:
+        try:
+            with open(self.path(self.key(method, url, body)), "rb") as f:
+                return self._zstd.ZstdDecompressor().decompress(f.read())
+
+        except FileNotFoundError:
+            return None
+
+    def put(self, method: str, url: str, content: bytes, body=None):
+        path = self.path(self.key(method, url, body))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Written to a temporary file first so that a crash never leaves half an entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._zstd.ZstdCompressor(
+                    level=COMPRESSION_LEVEL).compress(content))
+            os.replace(tmp_path, path)
+
+        except Exception as e:
+            logger.warning(f"Could not cache {url}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def as_response(url: str, content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = content
+    return response
+
+
+_cache = None
+
+
+def configure_response_cache(mode: str = None, root: str = CACHE_DIR):
+    global _cache
+    _cache = ResponseCache(root, mode) if mode else None
+
+
+def get_response_cache() -> ResponseCache:
+    return _cache
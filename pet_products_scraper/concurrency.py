@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from loguru import logger
+
+INITIAL_CONCURRENCY = 1
+DECREASE_FACTOR = 0.5
+LATENCY_WINDOW = 50
+MIN_SAMPLES = 10
+LATENCY_TOLERANCE = 2
+MAX_ERROR_RATE = 0.1
+
+BLOCK_STATUS_CODES = {403, 429}
+CHALLENGE_MARKERS = (
+    "Just a moment...",
+    "Attention Required! | Cloudflare",
+)
+
+_block_signal = ContextVar("block_signal", default=None)
+
+
+# Deliberately not a RequestException so that tenacity does not retry it
+class BlockedError(Exception):
+    pass
+
+
+def is_blocked(status_code: int, headers: dict = None, text: str = "") -> bool:
+    if status_code in BLOCK_STATUS_CODES or (status_code or 0) >= 500:
+        return True
+
+    # Cloudflare flags its challenge pages even when they are served with a 200
+    if headers and headers.get("cf-mitigated") == "challenge":
+        return True
+
+    return any(marker in text for marker in CHALLENGE_MARKERS)
+
+
+@contextmanager
+def watch_blocks():
+    # Collects block reports from everything fetched for one product, including
+    # the calls made from worker threads (asyncio.to_thread copies the context)
+    signal = threading.Event()
+    token = _block_signal.set(signal)
+    try:
+        yield signal
+
+    finally:
+        _block_signal.reset(token)
+
+
+def report_block():
+    signal = _block_signal.get()
+    if signal is not None:
+        signal.set()
+
+
+# Additive increase, multiplicative decrease of the number of products in flight.
+# The limit grows by one after a full round of healthy responses while the p95
+# latency stays within LATENCY_TOLERANCE of the best seen, and is cut on blocks.
+class AdaptiveConcurrency:
+    def __init__(self, name: str, maximum: int, initial: int = INITIAL_CONCURRENCY, minimum: int = 1):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = max(minimum, min(initial, self.maximum))
+        self.peak = self.limit
+        self.in_flight = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.outcomes = deque(maxlen=LATENCY_WINDOW)
+        self.baseline = None
+        self.blocks = 0
+        self._healthy = 0
+        self._since_decrease = LATENCY_WINDOW
+        self._condition = None
+
+    def p95(self) -> float:
+        if not self.latencies:
+            return 0
+
+        latencies = sorted(self.latencies)
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0
+
+        return sum(self.outcomes) / len(self.outcomes)
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+        try:
+            yield
+
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def record(self, latency: float, blocked: bool = False, failed: bool = False):
+        self.latencies.append(latency)
+        self.outcomes.append(blocked or failed)
+        self._since_decrease += 1
+
+        if blocked:
+            self.blocks += 1
+            # Responses already in flight when the limit was cut say nothing new
+            if self._since_decrease > self.limit:
+                self._set_limit(int(self.limit * DECREASE_FACTOR), "blocked")
+                self._since_decrease = 0
+                self._healthy = 0
+            return
+
+        if len(self.latencies) < MIN_SAMPLES:
+            return
+
+        p95 = self.p95()
+        if self.baseline is None or p95 < self.baseline:
+            self.baseline = p95
+
+        if failed or p95 > self.baseline * LATENCY_TOLERANCE or self.error_rate() > MAX_ERROR_RATE:
+            self._healthy = 0
+            return
+
+        self._healthy += 1
+        if self._healthy >= self.limit:
+            self._healthy = 0
+            self._set_limit(self.limit + 1, "healthy")
+
+    def _set_limit(self, limit: int, reason: str):
+        limit = max(self.minimum, min(self.maximum, limit))
+        if limit == self.limit:
+            return
+
+        logger.info(
+            f"{self.name} concurrency {self.limit} -> {limit} ({reason}, p95 {self.p95():.2f}s, error rate {self.error_rate():.0%})")
+        self.limit = limit
+        self.peak = max(self.peak, limit)
+        if self._condition is not None:
+            asyncio.ensure_future(self._notify())
+
+    async def _notify(self):
+        # Wake up workers waiting for a slot that the new limit may free
+        async with self._condition:
+            self._condition.notify_all()
+
+    def summary(self):
+        logger.info(
+            f"{self.name} settled at concurrency {self.limit} (peak {self.peak}, max {self.maximum}), p95 {self.p95():.2f}s, {self.blocks} blocked responses")
@@ -0,0 +1,252 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random,
+)
+
+from .cache import CACHE_DIR, CacheMiss, get_response_cache
+from .throttle import get_rate_limiter
+
+API_URL = "https://api.feefo.com/api/10"
+FEEFO_HOST = "api.feefo.com"
+REQUESTS_PER_SECOND = 5
+BURST = 5
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 3
+POOL_SIZE = 16
+# Ratings barely move from one week to the next, and a TTL of several days keeps
+# them cached across daily runs
+RATING_TTL = float(os.getenv("FEEFO_RATING_TTL_DAYS", 7)) * 24 * 60 * 60
+CACHE_PATH = os.path.join(CACHE_DIR, "feefo.sqlite")
+# products/ratings takes a comma separated list of SKUs
+BATCH_SIZE = 20
+BATCH_WINDOW = 0.05
+
+
+# Feefo ratings shared by every shop that embeds the Feefo widget: one pooled
+# session, an on-disk TTL cache keyed by merchant and SKU, and products/ratings
+# lookups of concurrent products grouped into one request.
+class FeefoClient:
+    def __init__(self, cache_path: str = CACHE_PATH, ttl: float = RATING_TTL):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._memory = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ratings (key TEXT PRIMARY KEY, value TEXT, fetched_at REAL)")
+        return conn
+
+    def _cached(self, key: str) -> tuple:
+        # Returns (hit, rating); a product without reviews is a hit with a None rating
+        with self._lock:
+            if key in self._memory:
+                rating, fetched_at = self._memory[key]
+                if time.time() - fetched_at < self.ttl:
+                    return True, rating
+
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT value, fetched_at FROM ratings WHERE key=?", (key,)).fetchone()
+            finally:
+                conn.close()
+
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read the Feefo cache: {e}")
+            return False, None
+
+        if row is None or time.time() - row[1] >= self.ttl:
+            return False, None
+
+        rating = json.loads(row[0])
+        with self._lock:
+            self._memory[key] = (rating, row[1])
+
+        return True, rating
+
+    def _store(self, ratings: dict):
+        fetched_at = time.time()
+        with self._lock:
+            for key, rating in ratings.items():
+                self._memory[key] = (rating, fetched_at)
+
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO ratings (key, value, fetched_at) VALUES (?, ?, ?)",
+                                     [(key, json.dumps(rating), fetched_at) for key, rating in ratings.items()])
+            finally:
+                conn.close()
+
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write the Feefo cache: {e}")
+
+    def _replaying(self) -> bool:
+        cache = get_response_cache()
+        return cache is not None and cache.replay
+
+    @retry(
+        wait=wait_random(min=0, max=2),
+        stop=stop_after_attempt(MAX_RETRIES),
+        retry=retry_if_exception_type(requests.RequestException),
+        before_sleep=before_sleep_log(logger, "WARNING"),
+        reraise=True,
+    )
+    def _get(self, url: str) -> tuple:
+        # Returns (status code, JSON body) and goes through the response cache like PetProductsETL.request
+        cache = get_response_cache()
+        if cache is not None and cache.replay:
+            content = cache.get("GET", url)
+            if content is None:
+                raise CacheMiss(f"GET {url} is not in the response cache")
+
+            return 200, json.loads(content)
+
+        get_rate_limiter().wait(FEEFO_HOST, REQUESTS_PER_SECOND, BURST)
+        response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+        if response.status_code != 200:
+            return response.status_code, None
+
+        if cache is not None and cache.record:
+            cache.put("GET", url, response.content)
+
+        return 200, response.json()
+
+    def summary_rating(self, merchant: str, origin: str, sku: str, sku_param: str = "parent_product_sku", imported: bool = False):
+        endpoint = "importedreviews" if imported else "reviews"
+        key = f"{merchant}:{endpoint}:{sku_param}={sku}"
+        if not self._replaying():
+            hit, rating = self._cached(key)
+            if hit:
+                return rating
+
+        url = f"{API_URL}/{endpoint}/summary/product?since_period=ALL&{sku_param}={sku}&merchant_identifier={merchant}&origin={origin}"
+        try:
+            status_code, data = self._get(url)
+
+        except (requests.RequestException, CacheMiss) as e:
+            # A rating is never worth failing the product over
+            logger.warning(f"Could not fetch the Feefo rating of {merchant} {sku}: {e}")
+            return None
+
+        if status_code == 200:
+            rating = data.get("rating", {}).get("rating")
+
+        elif status_code == 404:
+            rating = None
+
+        else:
+            logger.warning(f"Feefo returned {status_code} for {merchant} {sku}")
+            return None
+
+        self._store({key: rating})
+        return rating
+
+    async def prefetch_summary(self, merchant: str, origin: str, sku: str, sku_param: str = "parent_product_sku", imported: bool = False):
+        await asyncio.to_thread(self.summary_rating, merchant, origin, sku, sku_param, imported)
+
+    def product_ratings(self, merchant: str, skus: list) -> dict:
+        keys = {sku: f"{merchant}:ratings:{sku}" for sku in skus}
+        ratings = {}
+        missing = []
+        for sku in skus:
+            hit, rating = (False, None) if self._replaying() else self._cached(keys[sku])
+            if hit:
+                ratings[sku] = rating
+            else:
+                missing.append(sku)
+
+        # Recorded responses hold one SKU each, so replays and recordings are not grouped
+        batch_size = 1 if get_response_cache() is not None else BATCH_SIZE
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            url = f"{API_URL}/products/ratings?merchant_identifier={merchant}&review_count=true&product_sku={','.join(batch)}"
+            try:
+                status_code, data = self._get(url)
+
+            except (requests.RequestException, CacheMiss) as e:
+                logger.warning(
+                    f"Could not fetch the Feefo ratings of {len(batch)} {merchant} skus: {e}")
+                continue
+
+            if status_code != 200:
+                logger.warning(
+                    f"Feefo returned {status_code} for {len(batch)} {merchant} skus")
+                continue
+
+            found = {product.get("sku"): product.get("rating")
+                     for product in data.get("products", [])}
+            fetched = {sku: found.get(sku) for sku in batch}
+            self._store({keys[sku]: rating for sku, rating in fetched.items()})
+            ratings.update(fetched)
+
+        return ratings
+
+    def product_rating(self, merchant: str, sku: str):
+        return self.product_ratings(merchant, [sku]).get(sku)
+
+    async def prefetch_product_rating(self, merchant: str, sku: str):
+        # Products scraped at the same time share one products/ratings request
+        if not self._replaying() and self._cached(f"{merchant}:ratings:{sku}")[0]:
+            return
+
+        loop = asyncio.get_running_loop()
+        batch = self._pending.setdefault(merchant, {})
+        if sku not in batch:
+            batch[sku] = loop.create_future()
+
+        future = batch[sku]
+        if len(batch) >= BATCH_SIZE:
+            self._flush(merchant)
+        elif len(batch) == 1:
+            loop.call_later(BATCH_WINDOW, self._flush, merchant)
+
+        await future
+
+    def _flush(self, merchant: str):
+        batch = self._pending.pop(merchant, None)
+        if batch:
+            asyncio.ensure_future(self._fetch_batch(merchant, batch))
+
+    async def _fetch_batch(self, merchant: str, batch: dict):
+        try:
+            await asyncio.to_thread(self.product_ratings, merchant, list(batch))
+
+        except Exception as e:
+            logger.error(f"Error fetching Feefo ratings for {merchant}: {e}")
+
+        for future in batch.values():
+            if not future.done():
+                future.set_result(None)
+
+
+_client = None
+
+
+def get_feefo_client() -> FeefoClient:
+    global _client
+    if _client is None:
+        _client = FeefoClient()
+
+    return _client
@@ -0,0 +1,225 @@
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from bs4 import BeautifulSoup
+from loguru import logger
+
+from .cache import CACHE_DIR
+
+# Transports from the cheapest to the heaviest
+HTTP = "http"
+CLOUDSCRAPER = "cloudscraper"
+BROWSER = "browser"
+DRIVER = "driver"
+TIERS = [HTTP, CLOUDSCRAPER, BROWSER, DRIVER]
+
+# A host is tried on the cheaper tiers again once its winning tier is this old
+TIER_TTL = 24 * 60 * 60
+TIERS_PATH = os.path.join(CACHE_DIR, "fetch_tiers.sqlite")
+
+
+# One transport of a shop. fetch returns None when the page could not be had;
+# fail_fast is set when a heavier tier is left to fall back on, so that a
+# blocked page is given up on at once instead of being retried.
+class Fetcher(ABC):
+    def __init__(self, etl):
+        self.etl = etl
+
+    @abstractmethod
+    async def fetch(self, url: str, selector: str = None, fail_fast: bool = False, **kwargs) -> BeautifulSoup:
+        pass
+
+
+class HttpFetcher(Fetcher):
+    async def fetch(self, url: str, selector: str = None, fail_fast: bool = False, **kwargs) -> BeautifulSoup:
+        if not fail_fast:
+            return await self.etl.fetch_page(url, **kwargs)
+
+        response = await self.etl.fetch_http(url, **kwargs)
+        if response is None:
+            return None
+
+        logger.info(
+            f"Successfully extracted data from {url} {response.status_code}")
+        return BeautifulSoup(response.content, "html.parser")
+
+
+class CloudscraperFetcher(Fetcher):
+    async def fetch(self, url: str, selector: str = None, fail_fast: bool = False, **kwargs) -> BeautifulSoup:
+        return await asyncio.to_thread(self.etl.extract_from_cloudscraper, url, **kwargs)
+
+
+class BrowserFetcher(Fetcher):
+    async def fetch(self, url: str, selector: str = None, fail_fast: bool = False, **kwargs) -> BeautifulSoup:
+        return await self.etl.extract_scrape_content(url, selector)
+
+
+class DriverFetcher(Fetcher):
+    async def fetch(self, url: str, selector: str = None, fail_fast: bool = False, **kwargs) -> BeautifulSoup:
+        return await asyncio.to_thread(self.page_source, url)
+
+    def page_source(self, url: str) -> BeautifulSoup:
+        cached = self.etl.read_cache("GET", url)
+        if cached is not None:
+            return BeautifulSoup(cached, "html.parser")
+
+        self.etl.throttle(url)
+        driver = self.etl.extract_from_driver(url)
+        try:
+            html = driver.page_source
+
+        finally:
+            driver.quit()
+
+        self.etl.write_cache("GET", url, html.encode())
+        return BeautifulSoup(html, "html.parser")
+
+
+# Sessions that keep their cookies, user agent and connections between requests,
+# each used by one worker thread at a time. A session is only replaced once the
+# site rejects it, so a challenge is solved about once per session lifetime.
+class SessionPool:
+    def __init__(self, factory, size: int, name: str = ""):
+        self.factory = factory
+        self.size = size
+        self.name = name
+        self.opened = 0
+        self._idle = []
+        self._open = 0
+        # Signalled whenever a session is returned or a rejected one frees a place
+        self._available = threading.Condition()
+
+    def checkout(self):
+        with self._available:
+            while not self._idle and self._open >= self.size:
+                self._available.wait()
+
+            if self._idle:
+                # The most recently used session is the one most likely still cleared
+                return self._idle.pop()
+
+            self._open += 1
+            self.opened += 1
+            opened = self.opened
+
+        try:
+            session = self.factory()
+
+        except Exception:
+            with self._available:
+                self._open -= 1
+                self._available.notify()
+            raise
+
+        logger.info(f"Opened {self.name} session {opened}")
+        return session
+
+    def release(self, session, rejected: bool = False):
+        if not rejected:
+            with self._available:
+                self._idle.append(session)
+                self._available.notify()
+            return
+
+        logger.warning(f"Rotating a rejected {self.name} session")
+        self._discard(session)
+
+    def _discard(self, session):
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+        session.close()
+
+    def close(self):
+        if self.opened:
+            logger.info(f"Opened {self.opened} {self.name} sessions in total")
+
+        with self._available:
+            idle, self._idle = self._idle, []
+
+        for session in idle:
+            self._discard(session)
+
+
+FETCHERS = {
+    HTTP: HttpFetcher,
+    CLOUDSCRAPER: CloudscraperFetcher,
+    BROWSER: BrowserFetcher,
+    DRIVER: DriverFetcher,
+}
+
+
+# The tier that last worked for each host, kept on disk so that the next run
+# starts there instead of paying for the cheaper tiers being blocked again.
+class TierMemory:
+    def __init__(self, path: str = TIERS_PATH, ttl: float = TIER_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tiers (host TEXT PRIMARY KEY, tier TEXT, chosen_at REAL)")
+        return conn
+
+    def get(self, host: str) -> str:
+        with self._lock:
+            if host not in self._memory:
+                self._memory[host] = self._load(host)
+
+            tier, chosen_at = self._memory[host]
+
+        if tier is None or time.time() - chosen_at >= self.ttl:
+            return None
+
+        return tier
+
+    def _load(self, host: str) -> tuple:
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT tier, chosen_at FROM tiers WHERE host=?", (host,)).fetchone()
+            finally:
+                conn.close()
+
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read the fetch tiers: {e}")
+            row = None
+
+        return row or (None, 0)
+
+    def remember(self, host: str, tier: str):
+        chosen_at = time.time()
+        with self._lock:
+            self._memory[host] = (tier, chosen_at)
+
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO tiers (host, tier, chosen_at) VALUES (?, ?, ?)",
+                                 (host, tier, chosen_at))
+            finally:
+                conn.close()
+
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write the fetch tiers: {e}")
+
+
+_memory = None
+
+
+def get_tier_memory() -> TierMemory:
+    global _memory
+    if _memory is None:
+        _memory = TierMemory()
+
+    return _memory
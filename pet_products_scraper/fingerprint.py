@@ -0,0 +1,8 @@
+import json
+import hashlib
+
+
+def hash_fragments(*fragments) -> str:
+    # Key order and whitespace must not change the hash, only the values
+    raw = json.dumps(fragments, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
@@ -0,0 +1,45 @@
+import random
+import asyncio
+
+NONE = "none"
+LIGHT = "light"
+FULL = "full"
+# No humanization until the shop blocks a request, then FULL for the rest of the run
+ADAPTIVE = "adaptive"
+STEALTH_PROFILES = [NONE, LIGHT, FULL, ADAPTIVE]
+
+# (wheel scrolls, mouse moves, seconds between actions) per profile
+HUMANIZATION = {
+    NONE: ((0, 0), (0, 0), (0, 0)),
+    LIGHT: ((1, 2), (1, 3), (0.1, 0.3)),
+    FULL: ((3, 6), (5, 10), (0.5, 1)),
+}
+
+
+async def humanize(page, profile: str):
+    scrolls, moves, delay = HUMANIZATION[profile]
+
+    for _ in range(random.randint(*scrolls)):
+        await page.mouse.wheel(0, random.randint(300, 700))
+        await asyncio.sleep(random.uniform(*delay))
+
+    for _ in range(random.randint(*moves)):
+        await page.mouse.move(random.randint(0, 800), random.randint(0, 600))
+        await asyncio.sleep(random.uniform(*delay))
+
+
+_override = None
+
+
+def configure_stealth(profile: str = None):
+    # Overrides the profile of every shop, e.g. from the command line
+    global _override
+    if profile and profile not in STEALTH_PROFILES:
+        raise ValueError(
+            f"Unknown stealth profile {profile}, expected one of {', '.join(STEALTH_PROFILES)}")
+
+    _override = profile or None
+
+
+def get_stealth_override() -> str:
+    return _override
@@ -1,73 +1,12 @@
-import random
-import time
+import asyncio
 import pandas as pd
 from loguru import logger
 
-from pet_products_scraper import (
-    ZooplusETL,
-    PetsAtHomeETL,
-    JollyesETL,
-    LilysKitchenETL,
-    BitibaETL,
-    PetSupermarketETL,
-    PetPlanetETL,
-    PurinaETL,
-    DirectVetETL,
-    FishKeeperETL,
-    PetDrugsOnlineETL,
-    ViovetETL,
-    PetShopETL,
-    VetShopETL,
-    VetUKETL,
-    BurnsPetETL,
-    AsdaETL,
-    TheRangeETL,
-    OcadoETL,
-    HarringtonsETL,
-    BernPetFoodsETL,
-    PetsCornerETL,
-    OrijenETL,
-    ThePetExpressETL,
-    PetShopOnlineETL,
-    TaylorPetFoodsETL,
-    TheNaturalPetStoreETL,
-    HealthyPetStoreETL,
-    FarmAndPetPlaceETL,
-    NaturesMenuETL,
-)
-
-factory = {
-    "Zooplus": ZooplusETL(),
-    "PetsAtHome": PetsAtHomeETL(),
-    "Jollyes": JollyesETL(),
-    "LilysKitchen": LilysKitchenETL(),
-    "Bitiba": BitibaETL(),
-    "PetSupermarket": PetSupermarketETL(),
-    "PetPlanet": PetPlanetETL(),
-    "Purina": PurinaETL(),
-    "DirectVet": DirectVetETL(),
-    "FishKeeper": FishKeeperETL(),
-    "PetDrugsOnline": PetDrugsOnlineETL(),
-    "Viovet": ViovetETL(),
-    "PetShop": PetShopETL(),
-    "VetShop": VetShopETL(),
-    "VetUK": VetUKETL(),
-    "BurnsPet": BurnsPetETL(),
-    "ASDAGroceries": AsdaETL(),
-    "TheRange": TheRangeETL(),
-    "Ocado": OcadoETL(),
-    "Harringtons": HarringtonsETL(),
-    "BernPetFoods": BernPetFoodsETL(),
-    "PetsCorner": PetsCornerETL(),
-    "Orijen": OrijenETL(),
-    "ThePetExpress": ThePetExpressETL(),
-    "PetShopOnline": PetShopOnlineETL(),
-    "TaylorPetFoods": TaylorPetFoodsETL(),
-    "TheNaturalPetStore": TheNaturalPetStoreETL(),
-    "HealthyPetStore": HealthyPetStoreETL(),
-    "FarmAndPetPlace": FarmAndPetPlaceETL(),
-    "NaturesMenu": NaturesMenuETL(),
-}
+from .browser import close_browser_pool
+from .registry import SHOP_REGISTRY, get_shop_etl
+from .throttle import get_rate_limiter
+
+HARD_SCRAPE_SECONDS = 90
 
 
 class PetImage():
@@ -77,17 +16,23 @@ class PetImage():
         self.df['full_url'] = self.df['base_url'].str[:-1] + self.df['url']
 
     def run_etl(self, shop: str):
-        if shop in factory:
-            return factory[shop]
-        else:
-            raise ValueError(
-                f"Shop {shop} is not supported. Please pass a valid shop.")
+        return get_shop_etl(shop)
 
     def extract(self, min_sec: int, max_sec: int):
+        asyncio.run(self.extract_async(min_sec, max_sec))
+
+    async def extract_async(self, min_sec: int, max_sec: int):
+        try:
+            await self.extract_shops(min_sec, max_sec)
+
+        finally:
+            await close_browser_pool()
+
+    async def extract_shops(self, min_sec: int, max_sec: int):
         hard_scrape_companies = ['Zooplus', 'Bitiba']
         valid_companies = [
             company for company in self.df['shop_name'].unique()
-            if company in factory.keys()
+            if company in SHOP_REGISTRY
         ]
         for c in valid_companies:
             logger.info(f"Scraping images for {c}...")
@@ -95,26 +40,22 @@ class PetImage():
             sample_df = self.df[self.df['shop_name'] == c]
             scrape_links = sample_df['full_url'].drop_duplicates().tolist()
             scraper = self.run_etl(c)
+            # Image pages get their own budget, separate from the product scrape
+            if c in hard_scrape_companies:
+                rate = 1 / HARD_SCRAPE_SECONDS
+            else:
+                rate = 2 / (min_sec + max_sec)
             scrape_payload = []
             i = 0
             for link in scrape_links:
                 try:
-                    scrape_df = scraper.image_scrape_product(link)
+                    await get_rate_limiter().wait_async(f"{c}/image", rate, 1)
+                    scrape_df = await scraper.image_scrape_product_async(link)
                     if scrape_df is not None:
                         scrape_payload.append(scrape_df)
                         i += 1
 
                     logger.info(f"Scraped {i} out of {len(scrape_links)}")
-                    if c in hard_scrape_companies:
-                        sleep_time = random.uniform(60, 120)
-                        logger.info(
-                            f"Sleeping for {sleep_time:.2f} seconds...")
-                        time.sleep(sleep_time)
-                    else:
-                        sleep_time = random.uniform(min_sec, max_sec)
-                        logger.info(
-                            f"Sleeping for {sleep_time:.2f} seconds...")
-                        time.sleep(sleep_time)
 
                 except Exception as e:
                     logger.error(f"Error scraping {link}: {e}")
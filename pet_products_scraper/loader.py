@@ -0,0 +1,100 @@
+import time
+import asyncio
+import threading
+import pandas as pd
+from loguru import logger
+from sqlalchemy import Engine
+
+from .utils import bulk_update_url_scrape_status
+
+FLUSH_SIZE = 500
+FLUSH_INTERVAL = 60
+INSERT_CHUNK_SIZE = 1000
+
+
+class BufferedLoader:
+    # Accumulates transformed rows across products and writes them with multi-row
+    # inserts once flush_size rows or flush_interval seconds have built up. Scrape
+    # statuses are held back with the rows so a url is only marked DONE after its
+    # rows reached the database.
+
+    def __init__(self, db_conn: Engine, table_name: str, flush_size: int = FLUSH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.db_conn = db_conn
+        self.table_name = table_name
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._frames = []
+        self._n_rows = 0
+        self._statuses = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    async def add(self, data: pd.DataFrame):
+        with self._lock:
+            self._frames.append(data)
+            self._n_rows += data.shape[0]
+
+        await self._maybe_flush()
+
+    async def add_status(self, pkey: int, status: str, timestamp: str, etag: str = None, last_modified: str = None, fingerprint: str = None):
+        with self._lock:
+            self._statuses.append(
+                (pkey, status, timestamp, etag, last_modified, fingerprint))
+
+        await self._maybe_flush()
+
+    async def _maybe_flush(self):
+        if self._n_rows >= self.flush_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush_async()
+
+    def _take(self) -> tuple:
+        with self._lock:
+            frames, self._frames = self._frames, []
+            statuses, self._statuses = self._statuses, []
+            n, self._n_rows = self._n_rows, 0
+            self._last_flush = time.monotonic()
+
+        return frames, statuses, n
+
+    async def flush_async(self):
+        # The transaction runs on a worker thread so the scrape workers sharing the
+        # loop keep fetching while it commits
+        frames, statuses, n = self._take()
+        if frames or statuses:
+            await asyncio.to_thread(self._write, frames, statuses, n)
+
+    def flush(self):
+        self._write(*self._take())
+
+    def _write(self, frames: list, statuses: list, n: int):
+        if not frames and not statuses:
+            return
+
+        # One batch at a time, so the statuses of a batch never overtake its rows
+        with self._write_lock:
+            # Rows and their url statuses are committed together
+            with self.db_conn.begin() as conn:
+                if frames:
+                    data = pd.concat(frames, ignore_index=True)
+                    data.to_sql(self.table_name, conn, if_exists="append",
+                                index=False, method="multi", chunksize=INSERT_CHUNK_SIZE)
+                    logger.info(
+                        f"Successfully loaded {n} records to the {self.table_name}.")
+
+                if statuses:
+                    bulk_update_url_scrape_status(conn, statuses)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # Ctrl+C surfaces as KeyboardInterrupt or a cancelled run, so buffered rows
+        # are flushed on SIGINT too, blocking the loop since it is going away
+        if exc_type is not None:
+            logger.warning(
+                f"Flushing buffered {self.table_name} rows before stopping ({exc_type.__name__})")
+            self.flush()
+            return
+
+        await self.flush_async()
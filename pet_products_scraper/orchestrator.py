@@ -0,0 +1,143 @@
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sqlalchemy import Engine, text
+from loguru import logger
+
+from .browser import POOL_SIZE, MAX_PAGES_PER_CONTEXT, BrowserBudget, close_browser_pool, configure_browser_pool
+from .cache import CACHE_DIR, configure_response_cache, get_response_cache
+from .humanize import configure_stealth, get_stealth_override
+from .loader import FLUSH_SIZE
+from .registry import get_shop_etl
+from .throttle import get_rate_limiter
+from .utils import clear_shop_staging, execute_query, get_db_conn, get_sql_from_file
+
+MAX_WORKERS = 8
+MAX_SOCKETS = 64
+
+PRODUCT_INSERTS = [
+    "insert_into_pet_products.sql",
+    "insert_into_pet_product_variants.sql",
+    "insert_into_pet_product_variant_prices.sql",
+]
+
+
+def run_task(engine: Engine, task: str, shop: str, concurrency: int = None, flush_size: int = FLUSH_SIZE, max_concurrency: int = None):
+    client = get_shop_etl(shop)
+    params = {"shop": client.SHOP}
+
+    # Link refresh crawls CONCURRENCY categories at once, so the socket budget covers it too
+    if concurrency:
+        client.CONCURRENCY = concurrency
+
+    if max_concurrency:
+        client.CONCURRENCY = min(client.CONCURRENCY, max_concurrency)
+
+    if task == "get_links":
+        # Clears the shop's staged links and registers the new ones itself
+        client.refresh_links(engine, "stg_urls")
+
+    elif task in ("scrape", "pipeline"):
+        clear_shop_staging(engine, "stg_pet_products", client.SHOP)
+        if task == "pipeline":
+            client.run_pipeline(engine, "stg_pet_products",
+                                "stg_urls", flush_size=flush_size)
+        else:
+            client.run(engine, "stg_pet_products", flush_size=flush_size)
+
+        for file_name in PRODUCT_INSERTS:
+            sql = get_sql_from_file(file_name)
+            execute_query(engine, sql, params)
+
+
+def _worker_settings() -> dict:
+    # Spawned workers start from a fresh interpreter, so the settings made by
+    # main.py are handed over explicitly instead of being inherited
+    cache = get_response_cache()
+    return {
+        "cache_mode": cache.mode if cache is not None else None,
+        "cache_dir": cache.root if cache is not None else CACHE_DIR,
+        "stealth": get_stealth_override(),
+        "rate_limited": get_rate_limiter().enabled,
+    }
+
+
+def _init_worker(budget: BrowserBudget, browsers: int, pages_per_context: int, settings: dict):
+    configure_browser_pool(browsers, pages_per_context, budget)
+    configure_response_cache(settings["cache_mode"], settings["cache_dir"])
+    configure_stealth(settings["stealth"])
+    get_rate_limiter().enabled = settings["rate_limited"]
+
+
+def _run_in_worker(db_settings: dict, task: str, shop: str, concurrency: int, flush_size: int, max_concurrency: int) -> float:
+    start_time = time.monotonic()
+    engine = get_db_conn(**db_settings)
+    try:
+        run_task(engine, task, shop, concurrency, flush_size, max_concurrency)
+
+    finally:
+        asyncio.run(close_browser_pool())
+        engine.dispose()
+
+    return time.monotonic() - start_time
+
+
+def order_shops(engine: Engine, task: str, shops: list) -> list:
+    # Longest queues first so that the slowest shops do not start last
+    if task != "scrape":
+        return list(shops)
+
+    sql = get_sql_from_file("count_unscraped_urls.sql")
+    with engine.connect() as conn:
+        counts = dict(conn.execute(text(sql)).all())
+
+    return sorted(shops, key=lambda shop: counts.get(shop, 0), reverse=True)
+
+
+def run_shops(
+    db_settings: dict,
+    task: str,
+    shops: list,
+    workers: int = MAX_WORKERS,
+    browsers: int = POOL_SIZE,
+    pages_per_context: int = MAX_PAGES_PER_CONTEXT,
+    max_sockets: int = MAX_SOCKETS,
+    concurrency: int = None,
+    flush_size: int = FLUSH_SIZE,
+) -> dict:
+    # Every shop runs in a worker process of its own. Browsers are capped across
+    # processes by a shared budget and sockets by an equal share per process.
+    engine = get_db_conn(**db_settings)
+    shops = order_shops(engine, task, shops)
+    engine.dispose()
+
+    workers = max(1, min(workers, len(shops)))
+    max_concurrency = max(1, max_sockets // workers)
+    # fork is cheaper but does not exist on Windows
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(start_method)
+    budget = BrowserBudget(browsers, context)
+
+    logger.info(
+        f"Running {task} for {len(shops)} shops with {workers} workers, {browsers} browsers and {max_concurrency} sockets per shop")
+
+    durations = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(budget, min(browsers, POOL_SIZE), pages_per_context, _worker_settings())) as executor:
+        futures = {
+            executor.submit(_run_in_worker, db_settings, task, shop, concurrency, flush_size, max_concurrency): shop
+            for shop in shops
+        }
+
+        for future in as_completed(futures):
+            shop = futures[future]
+            try:
+                durations[shop] = future.result()
+                logger.info(
+                    f"Finished {task} for {shop} in {durations[shop]:.1f}s")
+
+            except Exception as e:
+                logger.error(f"{task} failed for {shop}: {e}")
+
+    return durations
@@ -0,0 +1,55 @@
+import importlib
+
+# Shop name -> (module, class). Modules are only imported when the shop is requested,
+# so heavy transports (playwright, cloudscraper, undetected_chromedriver) load on demand.
+SHOP_REGISTRY = {
+    "Zooplus": ("._zooplus_etl", "ZooplusETL"),  # WIP on how to bypass completly CloudFront
+    "PetsAtHome": ("._petsathome_etl", "PetsAtHomeETL"),
+    "Jollyes": ("._jollyes_etl", "JollyesETL"),
+    "LilysKitchen": ("._lilyskitchen_etl", "LilysKitchenETL"),
+    "Bitiba": ("._bitiba_etl", "BitibaETL"),  # WIP on how to bypass completly CloudFront
+    "PetSupermarket": ("._petsupermarket_etl", "PetSupermarketETL"),
+    "PetPlanet": ("._petplanet_etl", "PetPlanetETL"),
+    "Purina": ("._purina_etl", "PurinaETL"),
+    "DirectVet": ("._directvet_etl", "DirectVetETL"),
+    "FishKeeper": ("._fishkeeper_etl", "FishKeeperETL"),
+    "PetDrugsOnline": ("._petdrugsonline_etl", "PetDrugsOnlineETL"),
+    "Viovet": ("._viovet_etl", "ViovetETL"),
+    "PetShop": ("._petshop", "PetShopETL"),
+    "VetShop": ("._vetshop", "VetShopETL"),
+    "VetUK": ("._vetuk", "VetUKETL"),
+    "BurnsPet": ("._burnspet", "BurnsPetETL"),
+    "ASDAGroceries": ("._asda", "AsdaETL"),
+    "TheRange": ("._therange", "TheRangeETL"),  # Cloudflare problem
+    "Ocado": ("._ocado", "OcadoETL"),
+    "Harringtons": ("._harringtons", "HarringtonsETL"),
+    "BernPetFoods": ("._bernpetfoods", "BernPetFoodsETL"),
+    "PetsCorner": ("._petscorner", "PetsCornerETL"),
+    "Orijen": ("._orijen", "OrijenETL"),
+    "ThePetExpress": ("._thepetexpress", "ThePetExpressETL"),
+    "PetShopOnline": ("._petshoponline", "PetShopOnlineETL"),
+    "TaylorPetFoods": ("._taylorpetfoods", "TaylorPetFoodsETL"),
+    "TheNaturalPetStore": ("._thenaturalpetstore", "TheNaturalPetStoreETL"),
+    "HealthyPetStore": ("._healthypetstore", "HealthyPetStoreETL"),
+    "FarmAndPetPlace": ("._farmandpetplace", "FarmAndPetPlaceETL"),
+    "NaturesMenu": ("._naturesmenu", "NaturesMenuETL"),
+}
+
+_instances = {}
+
+
+def get_shop_class(shop: str) -> type:
+    if shop not in SHOP_REGISTRY:
+        raise ValueError(
+            f"Shop {shop} is not supported. Please pass a valid shop.")
+
+    module_name, class_name = SHOP_REGISTRY[shop]
+    module = importlib.import_module(module_name, __package__)
+    return getattr(module, class_name)
+
+
+def get_shop_etl(shop: str):
+    if shop not in _instances:
+        _instances[shop] = get_shop_class(shop)()
+
+    return _instances[shop]
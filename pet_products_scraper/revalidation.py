@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_validators = ContextVar("validators", default=None)
+
+
+def _as_header(value) -> str:
+    # Missing values come back from pandas as None or NaN
+    return value if isinstance(value, str) and value else None
+
+
+# ETag / Last-Modified of a product page, sent back on the next run so that an
+# unchanged page costs a bodiless 304 instead of a full download and parse.
+class Validators:
+    def __init__(self, url: str, etag: str = None, last_modified: str = None):
+        self.url = url
+        self.etag = _as_header(etag)
+        self.last_modified = _as_header(last_modified)
+        self.not_modified = False
+
+    def headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+    def update(self, status_code: int, headers: dict):
+        if status_code == 304:
+            self.not_modified = True
+            self.etag = headers.get("ETag", self.etag)
+            self.last_modified = headers.get(
+                "Last-Modified", self.last_modified)
+
+        elif status_code == 200:
+            self.etag = headers.get("ETag")
+            self.last_modified = headers.get("Last-Modified")
+
+    def discard(self):
+        # The response they came with was not the page that got used
+        self.etag = None
+        self.last_modified = None
+        self.not_modified = False
+
+
+@contextmanager
+def revalidate(url: str, etag: str = None, last_modified: str = None):
+    validators = Validators(url, etag, last_modified)
+    token = _validators.set(validators)
+    try:
+        yield validators
+
+    finally:
+        _validators.reset(token)
+
+
+def get_validators(url: str) -> Validators:
+    # Only the product page itself is revalidated, not the APIs called while parsing it
+    validators = _validators.get()
+    if validators is not None and validators.url == url:
+        return validators
+
+    return None
@@ -0,0 +1,76 @@
+import time
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+REQUESTS_PER_SECOND = 4
+BURST = 4
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # Takes a token, possibly going into debt, and returns how long the caller must
+        # wait before using it. Debt makes concurrent callers queue up behind each other.
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens +
+                              (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+
+            if self.tokens >= 0:
+                return 0
+
+            return -self.tokens / self.rate
+
+
+class RateLimiter:
+    # One token bucket per key (normally the host), shared by every thread and
+    # coroutine of the process so that concurrent workers spend the same budget.
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        # Turned off when replaying stored responses, which never reach a host
+        self.enabled = True
+
+    def bucket(self, key: str, rate: float = REQUESTS_PER_SECOND, burst: int = BURST) -> TokenBucket:
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(rate, burst)
+
+            return self._buckets[key]
+
+    def wait(self, key: str, rate: float = REQUESTS_PER_SECOND, burst: int = BURST):
+        if not self.enabled:
+            return
+
+        delay = self.bucket(key, rate, burst).reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, key: str, rate: float = REQUESTS_PER_SECOND, burst: int = BURST):
+        if not self.enabled:
+            return
+
+        delay = self.bucket(key, rate, burst).reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def get_host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+_rate_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    return _rate_limiter
@@ -1,5 +1,8 @@
+from functools import lru_cache
 from loguru import logger
-from sqlalchemy import create_engine, URL, Engine, text
+from sqlalchemy import create_engine, URL, Connection, Engine, text
+
+STATUS_BATCH_SIZE = 1000
 
 def get_db_conn(drivername: str, username: str, password: str, host: str, port: str, database: str) -> Engine:
     connection_string = URL.create(
@@ -13,6 +16,7 @@ def get_db_conn(drivername: str, username: str, password: str, host: str, port:
     db_conn = create_engine(connection_string)
     return db_conn
 
+@lru_cache(maxsize=None)
 def get_sql_from_file(file_name: str) -> str:
     with open(f"sql/{file_name}") as f:
         sql = f.read()
@@ -21,13 +25,43 @@ def get_sql_from_file(file_name: str) -> str:
 
 def update_url_scrape_status(db_engine: Engine, pkey: int, status: str, timestamp: str):
     sql = get_sql_from_file("update_url_scrape_status.sql")
-    sql = sql.format(status=status, timestamp=timestamp, pkey=pkey)
-    execute_query(db_engine, sql)
+    execute_query(db_engine, sql, {"status": status, "timestamp": timestamp, "pkey": int(pkey)})
+
+def bulk_update_url_scrape_status(conn: Connection, statuses: list):
+    # One UPDATE ... CASE statement per batch of (pkey, status, timestamp, etag, last_modified, fingerprint) tuples
+    template = get_sql_from_file("bulk_update_url_scrape_status.sql")
+
+    for start in range(0, len(statuses), STATUS_BATCH_SIZE):
+        batch = statuses[start:start + STATUS_BATCH_SIZE]
+        params = {}
+        for i, (pkey, status, timestamp, etag, last_modified, fingerprint) in enumerate(batch):
+            params[f"pkey_{i}"] = int(pkey)
+            params[f"status_{i}"] = status
+            params[f"timestamp_{i}"] = timestamp
+            params[f"etag_{i}"] = etag
+            params[f"last_modified_{i}"] = last_modified
+            params[f"fingerprint_{i}"] = fingerprint
+
+        sql = template.format(
+            status_cases=" ".join(f"WHEN :pkey_{i} THEN :status_{i}" for i in range(len(batch))),
+            timestamp_cases=" ".join(f"WHEN :pkey_{i} THEN :timestamp_{i}" for i in range(len(batch))),
+            etag_cases=" ".join(f"WHEN :pkey_{i} THEN :etag_{i}" for i in range(len(batch))),
+            last_modified_cases=" ".join(f"WHEN :pkey_{i} THEN :last_modified_{i}" for i in range(len(batch))),
+            fingerprint_cases=" ".join(f"WHEN :pkey_{i} THEN :fingerprint_{i}" for i in range(len(batch))),
+            pkeys=", ".join(f":pkey_{i}" for i in range(len(batch))),
+        )
+        conn.execute(text(sql), params)
+
+    logger.info(f"Updated the scrape status of {len(statuses)} urls.")
+
+def clear_shop_staging(engine: Engine, table_name: str, shop: str):
+    # Shop-scoped instead of TRUNCATE so that shops can be staged in parallel
+    execute_query(engine, f"DELETE FROM {table_name} WHERE shop=:shop;", {"shop": shop})
 
-def execute_query(engine: Engine, sql: str) -> None:
+def execute_query(engine: Engine, sql: str, params: dict = None) -> None:
     logger.info(f"Running query {sql}")
     with engine.connect() as conn:
-        conn.execute(text(sql))
+        conn.execute(text(sql), params)
         conn.commit()
 
-    logger.info("Query successfully executed.")
\ No newline at end of file
+    logger.info("Query successfully executed.")
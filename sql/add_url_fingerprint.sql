@@ -0,0 +1 @@
+ALTER TABLE urls ADD COLUMN fingerprint char(64);
\ No newline at end of file
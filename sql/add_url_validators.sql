@@ -0,0 +1 @@
+ALTER TABLE urls ADD COLUMN etag varchar(255), ADD COLUMN last_modified varchar(64);
\ No newline at end of file
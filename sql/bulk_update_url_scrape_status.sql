@@ -0,0 +1,7 @@
+UPDATE urls 
+SET scrape_status=CASE id {status_cases} END
+    ,updated_date=CASE id {timestamp_cases} END
+    ,etag=CASE id {etag_cases} END
+    ,last_modified=CASE id {last_modified_cases} END
+    ,fingerprint=CASE id {fingerprint_cases} END
+WHERE id IN ({pkeys})
\ No newline at end of file
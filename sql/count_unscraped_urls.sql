@@ -0,0 +1 @@
+SELECT shop, COUNT(*) FROM urls WHERE scrape_status<>'DONE' GROUP BY shop;
\ No newline at end of file
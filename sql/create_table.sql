@@ -54,6 +54,9 @@ CREATE TABLE urls (
     ,url varchar(255) CHARACTER SET utf8mb4
     ,scrape_status varchar(25) CHARACTER SET utf8mb4 DEFAULT 'NOT STARTED'
     ,updated_date datetime
+    ,etag varchar(255) CHARACTER SET utf8mb4
+    ,last_modified varchar(64) CHARACTER SET utf8mb4
+    ,fingerprint char(64)
 );
 
 DROP TABLE IF EXISTS stg_pet_products;
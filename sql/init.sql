@@ -12,7 +12,10 @@ CREATE TABLE urls (
     shop VARCHAR(50),
     url VARCHAR(255),
     scrape_status VARCHAR(25) DEFAULT 'NOT STARTED',
-    updated_date TIMESTAMP
+    updated_date TIMESTAMP,
+    etag VARCHAR(255),
+    last_modified VARCHAR(64),
+    fingerprint CHAR(64)
 );
 
 CREATE TABLE stg_pet_products (
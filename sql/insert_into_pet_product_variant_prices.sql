@@ -14,4 +14,5 @@ SELECT DISTINCT
 FROM stg_pet_products a 
 LEFT JOIN pet_product_variants b ON b.url=a.url AND IFNULL(b.variant,'')=IFNULL(a.variant,'')
 LEFT JOIN pet_product_variant_prices c ON c.product_variant_id=b.id AND c.shop_id=b.shop_id
-WHERE c.id IS NULL
\ No newline at end of file
+WHERE c.id IS NULL
+    AND a.shop=:shop
\ No newline at end of file
@@ -18,4 +18,5 @@ LEFT JOIN pet_product_variants c
     	-- Replace nulls with empty string to avoid issues with concatenating
     	AND IFNULL(c.variant,'')=IFNULL(a.variant,'')
 		AND c.shop_id=b.shop_id
-WHERE c.id IS NULL 
\ No newline at end of file
+WHERE c.id IS NULL
+    AND a.shop=:shop 
\ No newline at end of file
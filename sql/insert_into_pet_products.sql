@@ -14,4 +14,5 @@ SELECT DISTINCT
 FROM stg_pet_products a 
 LEFT JOIN shops b ON b.name=a.shop
 LEFT JOIN pet_products c ON c.url=a.url AND c.shop_id=b.id
-WHERE c.id IS NULL
\ No newline at end of file
+WHERE c.id IS NULL
+    AND a.shop=:shop
\ No newline at end of file
@@ -9,4 +9,5 @@ SELECT DISTINCT
     ,a.updated_date
 FROM stg_urls a 
 LEFT JOIN urls b ON b.url=a.url
-WHERE b.id IS NULL;
\ No newline at end of file
+WHERE b.id IS NULL
+    AND a.shop=:shop;
\ No newline at end of file
@@ -0,0 +1 @@
+SELECT DISTINCT id, url, etag, last_modified, fingerprint FROM urls WHERE shop='{shop}';
\ No newline at end of file
@@ -1 +1 @@
-SELECT DISTINCT id, url FROM urls WHERE scrape_status<>'DONE' AND shop='{shop}';
\ No newline at end of file
+SELECT DISTINCT id, url, etag, last_modified, fingerprint FROM urls WHERE scrape_status<>'DONE' AND shop='{shop}';
\ No newline at end of file
@@ -0,0 +1 @@
+SELECT DISTINCT id, url, etag, last_modified, fingerprint FROM urls WHERE scrape_status<>'DONE' AND shop=:shop AND url IN :urls;
\ No newline at end of file
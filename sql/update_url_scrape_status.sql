@@ -1,4 +1,4 @@
 UPDATE urls 
-SET scrape_status='{status}'
-    ,updated_date='{timestamp}'
-WHERE id={pkey}
\ No newline at end of file
+SET scrape_status=:status
+    ,updated_date=:timestamp
+WHERE id=:pkey